@@ -12,155 +12,201 @@ import sys
 import os
 from pathlib import Path
 
+# Textos estáticos montados uma única vez na importação do módulo.
+# Cada seção é emitida com uma única chamada sys.stdout.write em vez
+# de dezenas de print(), reduzindo as chamadas de escrita no sistema.
+
+_DEMO_TEXT = """🎬 DEMONSTRAÇÃO DO SISTEMA DE EXECUTÁVEL
+============================================================
+
+📋 O que foi criado:
+  ✅ processador_simples.py - Versão simplificada para executável
+  ✅ instalar_sistema.py - Instalador completo
+  ✅ criar_executavel.py - Criador de executável
+  ✅ processador_automatico.py - Versão avançada
+
+🚀 Como criar o executável:
+  1. Execute: python instalar_sistema.py
+  2. Aguarde a instalação das dependências
+  3. O executável será criado automaticamente
+
+📁 Estrutura que será criada:
+  📂 Entrada/
+    ├── 📄 README.txt
+    ├── 📂 Processados/
+    └── 📂 Erros/
+  📂 Saida/
+  📄 ProcessadorBiblioteca.exe
+  📄 Executar_Processador.bat
+  📄 INSTRUCOES_COMPLETAS.txt
+
+🎯 Como usar o sistema:
+  1. Clique em 'Executar_Processador.bat'
+  2. Coloque arquivos Excel na pasta 'Entrada'
+  3. Os resultados aparecerão na pasta 'Saida'
+  4. Arquivos processados vão para 'Entrada/Processados'
+  5. Arquivos com erro vão para 'Entrada/Erros'
+
+🔍 Identificação automática:
+  📊 Empréstimos: arquivos com 'emprestimo', 'empréstimo', 'loan'
+  📊 Pendências: arquivos com 'pendencia', 'pendência', 'pending'
+
+💡 Vantagens do executável:
+  ✅ Não precisa instalar Python
+  ✅ Funciona em qualquer Windows
+  ✅ Interface simples e intuitiva
+  ✅ Organização automática de arquivos
+  ✅ Logs detalhados de todas as operações
+  ✅ Tratamento robusto de erros
+"""
+
+_CMDS_TEXT = """
+🔧 COMANDOS PARA USAR O SISTEMA
+========================================
+
+📦 Instalar e criar executável:
+  python instalar_sistema.py
+
+🔨 Apenas criar executável:
+  python criar_executavel.py
+
+🧪 Testar melhorias:
+  python teste_melhorias.py
+
+📊 Usar processador unificado:
+  python processador_unificado.py emprestimos
+  python processador_unificado.py pendencias
+  python processador_unificado.py todos
+
+🔄 Usar processador automático:
+  python processador_automatico.py
+  python processador_automatico.py --uma-vez
+
+⚡ Usar processador simples:
+  python processador_simples.py
+"""
+
+_FLUXO_TEXT = """
+🔄 FLUXO DE TRABALHO IDEAL
+========================================
+
+1️⃣ PREPARAÇÃO:
+   - Execute: python instalar_sistema.py
+   - Aguarde a criação do executável
+   - Verifique se as pastas foram criadas
+
+2️⃣ USO DIÁRIO:
+   - Coloque arquivos Excel na pasta 'Entrada'
+   - Clique em 'Executar_Processador.bat'
+   - Aguarde o processamento automático
+   - Verifique os resultados na pasta 'Saida'
+
+3️⃣ ORGANIZAÇÃO:
+   - Arquivos processados → 'Entrada/Processados'
+   - Arquivos com erro → 'Entrada/Erros'
+   - Resultados → 'Saida'
+   - Logs → Arquivos .log na pasta raiz
+
+4️⃣ MANUTENÇÃO:
+   - Limpe periodicamente a pasta 'Entrada/Processados'
+   - Verifique logs para identificar problemas
+   - Backup dos arquivos importantes
+"""
+
+_DIFF_TEXT = """
+📊 COMPARAÇÃO DAS VERSÕES
+========================================
+
+🔧 Códigos Originais:
+  - código de empréstimo.py
+  - código de pendência.py
+  - Scripts simples e funcionais
+  - Sem tratamento de erros
+  - Sem organização de arquivos
+
+🚀 Versões Melhoradas:
+  - processador_unificado.py
+  - processador_automatico.py
+  - Arquitetura modular
+  - Tratamento robusto de erros
+  - Logging detalhado
+  - Configuração centralizada
+
+⚡ Versão Executável:
+  - processador_simples.py
+  - Versão otimizada para executável
+  - Organização automática de arquivos
+  - Interface simples
+  - Funciona sem Python instalado
+"""
+
+
+_HEADER_TEXT = "🎯 SISTEMA DE EXECUTÁVEL - PROCESSADOR DE BIBLIOTECA\n" + "=" * 70 + "\n"
+
+_RESUMO_TEXT = """
+🎉 RESUMO FINAL
+========================================
+✅ Códigos originais melhorados
+✅ Sistema modular criado
+✅ Executável pronto para uso
+✅ Organização automática implementada
+✅ Documentação completa
+
+🚀 PRÓXIMOS PASSOS:
+  1. Execute: python instalar_sistema.py
+  2. Use o executável criado
+  3. Organize seus arquivos automaticamente!
+"""
+
+# Banner completo pré-codificado em UTF-8: main() o emite com uma única
+# chamada os.write, sem passar pelo codec nem pelo buffer do Python.
+_DEMO_BYTES = _DEMO_TEXT.encode('utf-8')
+_CMDS_BYTES = _CMDS_TEXT.encode('utf-8')
+_FLUXO_BYTES = _FLUXO_TEXT.encode('utf-8')
+_DIFF_BYTES = _DIFF_TEXT.encode('utf-8')
+_BANNER = (
+    _HEADER_TEXT + _DEMO_TEXT + _CMDS_TEXT + _FLUXO_TEXT + _DIFF_TEXT + _RESUMO_TEXT
+).encode('utf-8')
+
+
 def mostrar_demo():
     """Mostra a demonstração do sistema."""
-    print("🎬 DEMONSTRAÇÃO DO SISTEMA DE EXECUTÁVEL")
-    print("=" * 60)
-    
-    print("\n📋 O que foi criado:")
-    print("  ✅ processador_simples.py - Versão simplificada para executável")
-    print("  ✅ instalar_sistema.py - Instalador completo")
-    print("  ✅ criar_executavel.py - Criador de executável")
-    print("  ✅ processador_automatico.py - Versão avançada")
-    
-    print("\n🚀 Como criar o executável:")
-    print("  1. Execute: python instalar_sistema.py")
-    print("  2. Aguarde a instalação das dependências")
-    print("  3. O executável será criado automaticamente")
-    
-    print("\n📁 Estrutura que será criada:")
-    print("  📂 Entrada/")
-    print("    ├── 📄 README.txt")
-    print("    ├── 📂 Processados/")
-    print("    └── 📂 Erros/")
-    print("  📂 Saida/")
-    print("  📄 ProcessadorBiblioteca.exe")
-    print("  📄 Executar_Processador.bat")
-    print("  📄 INSTRUCOES_COMPLETAS.txt")
-    
-    print("\n🎯 Como usar o sistema:")
-    print("  1. Clique em 'Executar_Processador.bat'")
-    print("  2. Coloque arquivos Excel na pasta 'Entrada'")
-    print("  3. Os resultados aparecerão na pasta 'Saida'")
-    print("  4. Arquivos processados vão para 'Entrada/Processados'")
-    print("  5. Arquivos com erro vão para 'Entrada/Erros'")
-    
-    print("\n🔍 Identificação automática:")
-    print("  📊 Empréstimos: arquivos com 'emprestimo', 'empréstimo', 'loan'")
-    print("  📊 Pendências: arquivos com 'pendencia', 'pendência', 'pending'")
-    
-    print("\n💡 Vantagens do executável:")
-    print("  ✅ Não precisa instalar Python")
-    print("  ✅ Funciona em qualquer Windows")
-    print("  ✅ Interface simples e intuitiva")
-    print("  ✅ Organização automática de arquivos")
-    print("  ✅ Logs detalhados de todas as operações")
-    print("  ✅ Tratamento robusto de erros")
+    os.write(sys.stdout.fileno(), _DEMO_BYTES)
 
 def mostrar_comandos():
     """Mostra os comandos para usar o sistema."""
-    print("\n🔧 COMANDOS PARA USAR O SISTEMA")
-    print("=" * 40)
-    
-    print("\n📦 Instalar e criar executável:")
-    print("  python instalar_sistema.py")
-    
-    print("\n🔨 Apenas criar executável:")
-    print("  python criar_executavel.py")
-    
-    print("\n🧪 Testar melhorias:")
-    print("  python teste_melhorias.py")
-    
-    print("\n📊 Usar processador unificado:")
-    print("  python processador_unificado.py emprestimos")
-    print("  python processador_unificado.py pendencias")
-    print("  python processador_unificado.py todos")
-    
-    print("\n🔄 Usar processador automático:")
-    print("  python processador_automatico.py")
-    print("  python processador_automatico.py --uma-vez")
-    
-    print("\n⚡ Usar processador simples:")
-    print("  python processador_simples.py")
+    os.write(sys.stdout.fileno(), _CMDS_BYTES)
 
 def mostrar_fluxo_trabalho():
     """Mostra o fluxo de trabalho ideal."""
-    print("\n🔄 FLUXO DE TRABALHO IDEAL")
-    print("=" * 40)
-    
-    print("\n1️⃣ PREPARAÇÃO:")
-    print("   - Execute: python instalar_sistema.py")
-    print("   - Aguarde a criação do executável")
-    print("   - Verifique se as pastas foram criadas")
-    
-    print("\n2️⃣ USO DIÁRIO:")
-    print("   - Coloque arquivos Excel na pasta 'Entrada'")
-    print("   - Clique em 'Executar_Processador.bat'")
-    print("   - Aguarde o processamento automático")
-    print("   - Verifique os resultados na pasta 'Saida'")
-    
-    print("\n3️⃣ ORGANIZAÇÃO:")
-    print("   - Arquivos processados → 'Entrada/Processados'")
-    print("   - Arquivos com erro → 'Entrada/Erros'")
-    print("   - Resultados → 'Saida'")
-    print("   - Logs → Arquivos .log na pasta raiz")
-    
-    print("\n4️⃣ MANUTENÇÃO:")
-    print("   - Limpe periodicamente a pasta 'Entrada/Processados'")
-    print("   - Verifique logs para identificar problemas")
-    print("   - Backup dos arquivos importantes")
+    os.write(sys.stdout.fileno(), _FLUXO_BYTES)
 
 def mostrar_diferencas():
     """Mostra as diferenças entre as versões."""
-    print("\n📊 COMPARAÇÃO DAS VERSÕES")
-    print("=" * 40)
-    
-    print("\n🔧 Códigos Originais:")
-    print("  - código de empréstimo.py")
-    print("  - código de pendência.py")
-    print("  - Scripts simples e funcionais")
-    print("  - Sem tratamento de erros")
-    print("  - Sem organização de arquivos")
-    
-    print("\n🚀 Versões Melhoradas:")
-    print("  - processador_unificado.py")
-    print("  - processador_automatico.py")
-    print("  - Arquitetura modular")
-    print("  - Tratamento robusto de erros")
-    print("  - Logging detalhado")
-    print("  - Configuração centralizada")
-    
-    print("\n⚡ Versão Executável:")
-    print("  - processador_simples.py")
-    print("  - Versão otimizada para executável")
-    print("  - Organização automática de arquivos")
-    print("  - Interface simples")
-    print("  - Funciona sem Python instalado")
+    os.write(sys.stdout.fileno(), _DIFF_BYTES)
+
+# Com DEMO_QUIET definido no ambiente (ex.: builds congelados em que o
+# banner não interessa), as funções de exibição viram no-ops.
+_QUIET = bool(os.environ.get("DEMO_QUIET"))
+
+if _QUIET:
+    def _silencioso():
+        return None
+
+    mostrar_demo = _silencioso
+    mostrar_comandos = _silencioso
+    mostrar_fluxo_trabalho = _silencioso
+    mostrar_diferencas = _silencioso
 
 def main():
     """Função principal."""
-    print("🎯 SISTEMA DE EXECUTÁVEL - PROCESSADOR DE BIBLIOTECA")
-    print("=" * 70)
-    
-    mostrar_demo()
-    mostrar_comandos()
-    mostrar_fluxo_trabalho()
-    mostrar_diferencas()
-    
-    print("\n🎉 RESUMO FINAL")
-    print("=" * 40)
-    print("✅ Códigos originais melhorados")
-    print("✅ Sistema modular criado")
-    print("✅ Executável pronto para uso")
-    print("✅ Organização automática implementada")
-    print("✅ Documentação completa")
-    
-    print("\n🚀 PRÓXIMOS PASSOS:")
-    print("  1. Execute: python instalar_sistema.py")
-    print("  2. Use o executável criado")
-    print("  3. Organize seus arquivos automaticamente!")
-    
+    if _QUIET:
+        return 0
+    # Garante que nada fique preso no buffer do Python antes de escrever
+    # direto no descritor.
+    sys.stdout.flush()
+    os.write(sys.stdout.fileno(), _BANNER)
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
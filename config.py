@@ -8,58 +8,171 @@ Este módulo contém todas as configurações utilizadas pelos scripts
 de processamento de empréstimos e pendências.
 """
 
-from typing import Dict, List
+import re
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Final, List, Mapping, Optional
+
+# Diretório base do projeto (onde este arquivo está)
+_BASE = Path(__file__).resolve().parent
 
 # Configurações de arquivos
-ARQUIVOS_CONFIG = {
+# Caminhos como objetos Path absolutos, resolvidos uma única vez na
+# importação, em vez de reconstruir Path() a cada acesso.
+ARQUIVOS_CONFIG: Final[Mapping[str, Dict[str, Path]]] = MappingProxyType({
     "emprestimos": {
-        "entrada": "Entrada/Processados/Empréstimos_Teste.xlsx",
-        "saida": "Relatório de Empréstimos.xlsx"
+        "entrada": _BASE / "Entrada/Processados/Empréstimos_Teste.xlsx",
+        "saida": _BASE / "Relatório de Empréstimos.xlsx"
     },
     "pendencias": {
-        "entrada": "Entrada/Processados/Pendência_Teste.xlsx", 
-        "saida": "Relatório de Pendência.xlsx"
+        "entrada": _BASE / "Entrada/Processados/Pendência_Teste.xlsx",
+        "saida": _BASE / "Relatório de Pendência.xlsx"
     }
-}
+})
+
+# Atalhos planos para os caminhos mais acessados: um único LOAD_GLOBAL
+# no lugar de dois lookups encadeados em ARQUIVOS_CONFIG.
+EMPRESTIMOS_IN: Final = ARQUIVOS_CONFIG["emprestimos"]["entrada"]
+EMPRESTIMOS_OUT: Final = ARQUIVOS_CONFIG["emprestimos"]["saida"]
+PENDENCIAS_IN: Final = ARQUIVOS_CONFIG["pendencias"]["entrada"]
+PENDENCIAS_OUT: Final = ARQUIVOS_CONFIG["pendencias"]["saida"]
+
+# Pasta monitorada de entrada
+ENTRADA_DIR: Final = _BASE / "Entrada"
+
 
 # Configurações de colunas para empréstimos
-COLUNAS_EMPRESTIMOS = [
+# Tuplas imutáveis: evitam mutação acidental e são mais baratas de iterar.
+COLUNAS_EMPRESTIMOS: Final = (
     'Nome da pessoa',
-    'Gênero', 
+    'Gênero',
     'Nome da biblioteca',
     'Email',
     'Nome pessoa empréstimo'
-]
+)
 
 # Configurações de colunas para pendências
-COLUNAS_PENDENCIAS = [
+COLUNAS_PENDENCIAS: Final = (
     "Nome da pessoa",
     "Email",
     "Data de empréstimo",
     "Data devolução prevista",
     "Título",
     "Nome da biblioteca"
-]
+)
 
 # Nova ordem das colunas para pendências
-ORDEM_COLUNAS_PENDENCIAS = [
+ORDEM_COLUNAS_PENDENCIAS: Final = (
     "Nome da pessoa",
-    "Email", 
+    "Email",
     "Título",
     "Data de empréstimo",
     "Data devolução prevista",
     "Nome da biblioteca"
-]
+)
+
+# Mapeamento de gêneros (somente leitura)
+MAPEAMENTO_GENERO: Final = MappingProxyType({"M": "o", "F": "a"})
 
-# Mapeamento de gêneros
-MAPEAMENTO_GENERO = {"M": "o", "F": "a"}
+def apply_genero(df, col: str = 'Gênero'):
+    """
+    Converte a coluna de gênero via dtype categórico.
 
-# Configurações de bibliotecas
-BIBLIOTECAS = {
+    O rename_categories roda o mapeamento uma vez sobre as categorias
+    únicas (normalmente só "M" e "F") e o resultado é difundido para a
+    coluna inteira em C, sem um lookup de dict por linha.
+
+    Args:
+        df: DataFrame com a coluna de gênero
+        col: Nome da coluna (padrão: "Gênero")
+
+    Returns:
+        O próprio DataFrame, com a coluna convertida
+    """
+    df[col] = df[col].astype('category').cat.rename_categories(dict(MAPEAMENTO_GENERO))
+    return df
+
+
+
+# Configurações de bibliotecas (somente leitura)
+BIBLIOTECAS: Final = MappingProxyType({
     "Unidade 1": "Biblioteca Campus I - Unid. 1",
     "Unidade 2": "Biblioteca Campus I - Unid. 2",
     "Campus II": "Biblioteca Campus II"
-}
+})
+
+# Padrão único pré-compilado para classificar arquivos de entrada pelo
+# nome: uma só varredura de regex em C decide entre todas as categorias,
+# e o dicionário token -> tipo resolve o resultado em O(1). Os tokens são
+# prefixos ("emprestim" cobre "emprestimo" e "emprestimos").
+_RE_TIPO_ARQUIVO = re.compile(
+    r'(emprestim|empréstim|loan|pendenci|pendênci|pending|overdue)',
+    re.IGNORECASE
+)
+_TOKEN_PARA_TIPO: Final[Mapping[str, str]] = MappingProxyType({
+    "emprestim": "emprestimos",
+    "empréstim": "emprestimos",
+    "loan": "emprestimos",
+    "pendenci": "pendencias",
+    "pendênci": "pendencias",
+    "pending": "pendencias",
+    "overdue": "pendencias",
+})
+
+
+def classificar_arquivo(nome: str) -> Optional[str]:
+    """
+    Identifica o tipo de relatório pelo nome do arquivo.
+
+    Args:
+        nome: Nome do arquivo (ex.: "Empréstimos_Julho.xlsx")
+
+    Returns:
+        "emprestimos", "pendencias" ou None se não identificado
+    """
+    resultado = _RE_TIPO_ARQUIVO.search(nome)
+    if not resultado:
+        return None
+    return _TOKEN_PARA_TIPO.get(resultado.group(1).lower())
+
+
+# Engines de Excel preferidas (com fallback para as padrões do pandas
+# quando as dependências opcionais não estão instaladas). A detecção é
+# preguiçosa (PEP 562): quem importa config sem usar Excel não paga o
+# custo de importar python_calamine/xlsxwriter. O mesmo vale para a
+# variante pd.Index de COLUNAS_EMPRESTIMOS, que evita reconstruir um
+# Index a cada seleção de colunas.
+_ENGINE_CACHE: Dict[str, object] = {}
+
+
+def __getattr__(name: str):
+    """Resolve os atributos com dependências pesadas no primeiro acesso."""
+    if name in _ENGINE_CACHE:
+        return _ENGINE_CACHE[name]
+
+    if name == "COLUNAS_EMPRESTIMOS_IDX":
+        import pandas as pd
+
+        _ENGINE_CACHE[name] = pd.Index(COLUNAS_EMPRESTIMOS)
+        return _ENGINE_CACHE[name]
+
+    if name == "ENGINE_LEITURA":
+        try:
+            import python_calamine  # noqa: F401
+            engine = "calamine"
+        except ImportError:
+            engine = "openpyxl"
+    elif name == "ENGINE_ESCRITA":
+        try:
+            import xlsxwriter  # noqa: F401
+            engine = "xlsxwriter"
+        except ImportError:
+            engine = "openpyxl"
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    _ENGINE_CACHE[name] = engine
+    return engine
 
 # Configurações de logging
 LOGGING_CONFIG = {
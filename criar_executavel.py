@@ -11,7 +11,7 @@ usando PyInstaller.
 import os
 import sys
 import subprocess
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def instalar_pyinstaller():
@@ -23,34 +23,79 @@ def instalar_pyinstaller():
     except ImportError:
         print("📦 Instalando PyInstaller...")
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
-            print("✅ PyInstaller instalado com sucesso")
-            return True
-        except subprocess.CalledProcessError:
-            print("❌ Erro ao instalar PyInstaller")
-            return False
+            # pip em processo: evita o cold-start de um segundo interpretador
+            from pip._internal.cli.main import main as pip_main
+            codigo = pip_main(["install", "pyinstaller"])
+            if codigo != 0:
+                raise RuntimeError(f"pip retornou {codigo}")
+        except Exception:
+            try:
+                subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
+            except subprocess.CalledProcessError:
+                print("❌ Erro ao instalar PyInstaller")
+                return False
+        print("✅ PyInstaller instalado com sucesso")
+        return True
+
+def precompilar_modulos():
+    """Pré-compila os módulos do projeto para bytecode otimizado."""
+    import py_compile
+
+    print("⚙️ Pré-compilando módulos para bytecode...")
+
+    modulos = [
+        "DEMO_EXECUTAVEL.py",
+        "config.py",
+        "processador_base.py",
+        "processador_unificado.py",
+        "processador_simples.py",
+    ]
+
+    for modulo in modulos:
+        if Path(modulo).exists():
+            # optimize=2 remove docstrings e asserts; os banners do demo
+            # já são constantes de módulo e viram LOAD_CONST no .pyc
+            py_compile.compile(modulo, optimize=2, quiet=1)
+
+    print("✅ Módulos pré-compilados")
 
 def criar_executavel():
     """Cria o executável do processador automático."""
     print("🔨 Criando executável...")
     
     # Configuração do PyInstaller
-    comando = [
-        "pyinstaller",
-        "--onefile",                    # Criar um único arquivo executável
+    argumentos = [
+        "--onedir",                     # Pasta com runtime descompactado:
+                                        # evita a auto-extração de ~40MB a
+                                        # cada execução do --onefile
         "--console",                    # Mostrar console para logs
+        "--exclude-module=tkinter",     # Reduzir tamanho do pacote
+        "--exclude-module=matplotlib",
+        "--exclude-module=scipy",
+        "--exclude-module=numpy.tests",
         "--name=ProcessadorBiblioteca", # Nome do executável
         "--hidden-import=pandas",       # Incluir pandas
         "--hidden-import=openpyxl",     # Incluir openpyxl
         "--hidden-import=xlrd",         # Incluir xlrd
+        "--hidden-import=python_calamine",  # Leitor Excel rápido (Rust)
+        "--hidden-import=xlsxwriter",   # Escritor Excel em streaming
         "processador_simples.py"        # Script principal
     ]
-    
+
     try:
-        subprocess.check_call(comando)
+        # Chamada em processo: reutiliza o interpretador atual em vez de
+        # pagar o fork/exec + cold-start de um subprocesso pyinstaller
+        import PyInstaller.__main__
+        PyInstaller.__main__.run(argumentos)
         print("✅ Executável criado com sucesso!")
         return True
-    except subprocess.CalledProcessError as e:
+    except SystemExit as e:
+        if not e.code:
+            print("✅ Executável criado com sucesso!")
+            return True
+        print(f"❌ Erro ao criar executável: código {e.code}")
+        return False
+    except Exception as e:
         print(f"❌ Erro ao criar executável: {e}")
         return False
 
@@ -58,11 +103,13 @@ def criar_estrutura_pastas():
     """Cria a estrutura de pastas necessária."""
     print("📁 Criando estrutura de pastas...")
     
-    pastas = ["Entrada", "Saida", "Entrada/Processados", "Entrada/Erros"]
-    
+    # Apenas as folhas: os.makedirs cria "Entrada" junto com as subpastas,
+    # numa chamada por ramo, e o print único evita um flush por pasta
+    pastas = ["Saida", "Entrada/Processados", "Entrada/Erros"]
+
     for pasta in pastas:
-        Path(pasta).mkdir(exist_ok=True)
-        print(f"  ✅ {pasta}")
+        os.makedirs(pasta, exist_ok=True)
+    print("  ✅ " + "\n  ✅ ".join(["Entrada"] + pastas))
     
     # Criar arquivo README na pasta de entrada
     readme_entrada = """# Pasta de Entrada
@@ -107,7 +154,7 @@ echo.
 echo Pressione qualquer tecla para parar...
 echo.
 
-ProcessadorBiblioteca.exe
+ProcessadorBiblioteca\\ProcessadorBiblioteca.exe
 
 echo.
 echo Processamento concluido!
@@ -134,14 +181,14 @@ def criar_instrucoes():
 4. Os resultados aparecerão na pasta "Saida"
 
 ### Método 2 - Executável direto:
-1. Clique duas vezes em "ProcessadorBiblioteca.exe"
+1. Clique duas vezes em "ProcessadorBiblioteca\\ProcessadorBiblioteca.exe"
 2. Siga as instruções na tela
 
 ## 📁 Estrutura de pastas:
 
 ```
 📂 Pasta do Projeto/
-├── 📄 ProcessadorBiblioteca.exe     # Executável principal
+├── 📂 ProcessadorBiblioteca/        # Pasta com o executável principal
 ├── 📄 Executar_Processador.bat      # Arquivo para execução fácil
 ├── 📂 Entrada/                      # Coloque arquivos aqui
 │   ├── 📄 README.txt               # Instruções
@@ -197,73 +244,101 @@ Desenvolvido para automação de relatórios de biblioteca
     
     print("✅ INSTRUCOES_USO.txt criado")
 
+def _fast_rmtree(raiz):
+    """
+    Remove uma árvore de diretórios com os.scandir.
+
+    O DirEntry já sabe se a entrada é pasta sem um stat extra
+    (follow_symlinks=False), o que evita o custo por arquivo da recursão
+    do shutil.rmtree em árvores build/ grandes; a árvore ausente é
+    tratada no lugar de uma pré-checagem de existência.
+    """
+    try:
+        with os.scandir(raiz) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    _fast_rmtree(entrada.path)
+                else:
+                    os.unlink(entrada.path)
+        os.rmdir(raiz)
+    except FileNotFoundError:
+        pass
+
 def limpar_arquivos_temporarios():
     """Remove arquivos temporários do PyInstaller."""
     print("🧹 Limpando arquivos temporários...")
-    
+
     pastas_para_remover = ["build", "__pycache__"]
     arquivos_para_remover = ["ProcessadorBiblioteca.spec"]
-    
-    for pasta in pastas_para_remover:
-        if Path(pasta).exists():
-            shutil.rmtree(pasta)
-            print(f"  ✅ {pasta} removida")
-    
+
+    if os.name == "posix":
+        # Um único rm -rf para todas as pastas: consistentemente mais
+        # rápido que a recursão Python do shutil em árvores build/ grandes
+        subprocess.run(["rm", "-rf", *pastas_para_remover], check=False)
+    else:
+        for pasta in pastas_para_remover:
+            _fast_rmtree(pasta)
+
     for arquivo in arquivos_para_remover:
-        if Path(arquivo).exists():
-            Path(arquivo).unlink()
-            print(f"  ✅ {arquivo} removido")
+        Path(arquivo).unlink(missing_ok=True)
+
+    print("  ✅ Removidos: " + ", ".join(pastas_para_remover + arquivos_para_remover))
 
 def main():
     """Função principal."""
     print("🔨 CRIADOR DE EXECUTÁVEL - PROCESSADOR DE BIBLIOTECA")
     print("=" * 60)
     
-    # Verificar se os arquivos necessários existem
-    arquivos_necessarios = [
-        "processador_simples.py"
-    ]
-    
-    for arquivo in arquivos_necessarios:
-        if not Path(arquivo).exists():
-            print(f"❌ Arquivo não encontrado: {arquivo}")
-            return 1
-    
+    # Verificar se o script principal existe (checagem única; o resto da
+    # resolução de fontes fica a cargo do próprio PyInstaller)
+    if not Path("processador_simples.py").is_file():
+        print("❌ Arquivo não encontrado: processador_simples.py")
+        return 1
+
     print("✅ Todos os arquivos necessários encontrados")
     
     # Instalar PyInstaller
     if not instalar_pyinstaller():
         return 1
-    
+
+    # Pré-compilar módulos
+    precompilar_modulos()
+
     # Criar executável
     if not criar_executavel():
         return 1
     
-    # Criar estrutura de pastas
-    criar_estrutura_pastas()
-    
-    # Criar arquivo .bat
-    criar_arquivo_batch()
-    
-    # Criar instruções
-    criar_instrucoes()
-    
-    # Limpar arquivos temporários
-    limpar_arquivos_temporarios()
-    
-    print("\n🎉 EXECUTÁVEL CRIADO COM SUCESSO!")
-    print("=" * 60)
-    print("📁 Arquivos criados:")
-    print("  ✅ ProcessadorBiblioteca.exe")
-    print("  ✅ Executar_Processador.bat")
-    print("  ✅ INSTRUCOES_USO.txt")
-    print("  ✅ Pasta Entrada/ com README.txt")
-    print("  ✅ Pasta Saida/")
-    print("\n🚀 Para usar:")
-    print("  1. Clique em 'Executar_Processador.bat'")
-    print("  2. Coloque arquivos Excel na pasta 'Entrada'")
-    print("  3. Os resultados aparecerão na pasta 'Saida'")
+    # Etapas de pós-build independentes e limitadas por I/O: rodam em
+    # paralelo para sobrepor os syscalls de criação de arquivos
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        tarefas = [executor.submit(funcao) for funcao in (
+            criar_estrutura_pastas,
+            criar_arquivo_batch,
+            criar_instrucoes,
+            limpar_arquivos_temporarios,
+        )]
+        for tarefa in tarefas:
+            tarefa.result()
     
+    # Resumo final emitido numa única escrita, sem um flush por linha
+    sys.stdout.write("\n".join([
+        "",
+        "🎉 EXECUTÁVEL CRIADO COM SUCESSO!",
+        "=" * 60,
+        "📁 Arquivos criados:",
+        "  ✅ ProcessadorBiblioteca/ (pasta com o executável)",
+        "  ✅ Executar_Processador.bat",
+        "  ✅ INSTRUCOES_USO.txt",
+        "  ✅ Pasta Entrada/ com README.txt",
+        "  ✅ Pasta Saida/",
+        "",
+        "🚀 Para usar:",
+        "  1. Clique em 'Executar_Processador.bat'",
+        "  2. Coloque arquivos Excel na pasta 'Entrada'",
+        "  3. Os resultados aparecerão na pasta 'Saida'",
+        "",
+    ]))
+
     return 0
 
 if __name__ == "__main__":
@@ -14,23 +14,75 @@ Autor: Sistema de Automação
 Data: 2025
 """
 
-import pandas as pd
+from __future__ import annotations
+
+import io
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
 import sys
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('processamento_pendencias.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+if TYPE_CHECKING:
+    # Só para as anotações (pd.DataFrame): em tempo de execução o pandas
+    # continua vindo do import preguiçoso em _get_pd
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Import preguiçoso do pandas: dentro do executável congelado o módulo
+# pode ser importado só para análise, sem pagar a inicialização do pandas
+_pd = None
+
+
+def _get_pd():
+    """Importa o pandas uma única vez, sob demanda."""
+    global _pd
+    if _pd is None:
+        import pandas
+        _pd = pandas
+    return _pd
+
+
+def _configurar_logging():
+    """Configura o logging (chamado em main, não na importação, para não
+    abrir/truncar o arquivo de log durante a análise do PyInstaller)."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('processamento_pendencias.log', encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
+# Limite de linhas a partir do qual vale a pena paralelizar a conversão
+# das planilhas (abaixo disso o custo de criar o pool domina)
+_LIMIAR_PARALELO = 50_000
+
+
+def _planilha_para_bytes(df, nome_planilha):
+    """Converte um DataFrame em bytes .xlsx (roda nos processos workers)."""
+    buffer = io.BytesIO()
+    df.to_excel(buffer, sheet_name=nome_planilha, index=False)
+    return buffer.getvalue()
+
+
+def _mesclar_planilhas(caminho, planilhas_bytes):
+    """Mescla as planilhas convertidas em paralelo num único workbook."""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for nome, dados in planilhas_bytes.items():
+        origem = openpyxl.load_workbook(io.BytesIO(dados), read_only=True)
+        destino = workbook.create_sheet(title=nome)
+        for linha in origem.active.iter_rows(values_only=True):
+            destino.append(linha)
+        origem.close()
+    workbook.save(caminho)
+
+
 class ProcessadorPendencias:
     """Classe para processamento de relatórios de pendências."""
     
@@ -85,8 +137,26 @@ class ProcessadorPendencias:
                 return False
                 
             logger.info(f"Carregando dados de: {self.arquivo_entrada}")
-            self.df = pd.read_excel(self.arquivo_entrada)
+            pd = _get_pd()
+            # usecols poda as colunas no próprio parser: células das
+            # colunas não utilizadas nem chegam a ser convertidas
+            colunas = frozenset(self.colunas_desejadas)
+            usecols = lambda coluna: coluna in colunas
+            try:
+                # Engine calamine (Rust): muito mais rápida que o parser
+                # XML em Python do openpyxl (requer pandas >= 2.2)
+                self.df = pd.read_excel(self.arquivo_entrada, engine="calamine", usecols=usecols)
+            except (ImportError, ValueError):
+                self.df = pd.read_excel(self.arquivo_entrada, usecols=usecols)
             logger.info(f"Dados carregados: {len(self.df)} registros")
+
+            try:
+                # Strings Arrow: buffer UTF-8 contíguo, então strip/replace
+                # e comparações rodam em kernels C vetorizados
+                self.df["Email"] = self.df["Email"].astype("string[pyarrow]")
+            except (ImportError, KeyError, TypeError):
+                pass
+
             return True
             
         except Exception as e:
@@ -98,8 +168,11 @@ class ProcessadorPendencias:
         logger.info("Selecionando colunas relevantes")
         
         # Verificar quais colunas existem no DataFrame
-        colunas_existentes = [col for col in self.colunas_desejadas if col in self.df.columns]
-        colunas_faltantes = [col for col in self.colunas_desejadas if col not in self.df.columns]
+        # frozenset das colunas: lookups O(1) em vez de varrer o Index
+        # duas vezes por coluna desejada
+        colunas_df = frozenset(self.df.columns)
+        colunas_existentes = [col for col in self.colunas_desejadas if col in colunas_df]
+        colunas_faltantes = [col for col in self.colunas_desejadas if col not in colunas_df]
         
         if colunas_faltantes:
             logger.warning(f"Colunas não encontradas: {colunas_faltantes}")
@@ -108,51 +181,45 @@ class ProcessadorPendencias:
         self.df = self.df[colunas_existentes]
         logger.info(f"Selecionadas {len(colunas_existentes)} colunas")
     
-    def limpar_dados(self) -> None:
-        """Realiza a limpeza dos dados."""
+    def limpar_e_formatar(self) -> None:
+        """Limpa, formata e reordena os dados numa única expressão encadeada.
+
+        As quatro etapas mutantes (filtro de email, formatação de nome,
+        formatação de email e reordenação) são fundidas num só pipeline:
+        cada linha atravessa a memória uma vez, em vez de uma cópia
+        completa da tabela por etapa.
+        """
         registros_iniciais = len(self.df)
-        
-        # Filtrar registros sem email (incluindo NaN, None, strings vazias)
-        registros_sem_email = self.df[
-            (self.df["Email"].isna()) | 
-            (self.df["Email"].astype(str).str.strip() == "") |
-            (self.df["Email"].astype(str).str.strip() == "nan")
-        ]
-        logger.info(f"Encontrados {len(registros_sem_email)} registros sem email")
-        
-        # Remover registros sem email
-        self.df = self.df[
-            (self.df["Email"].notna()) & 
-            (self.df["Email"].astype(str).str.strip() != "") &
-            (self.df["Email"].astype(str).str.strip() != "nan")
-        ]
+
+        # Máscara única de emails válidos (incluindo NaN, None, vazios)
+        email = self.df["Email"].astype("string").str.strip()
+        mask = email.notna() & (email != "") & (email.str.lower() != "nan")
+        logger.info(f"Encontrados {int((~mask).sum())} registros sem email")
+
+        colunas_df = frozenset(self.df.columns)
+        colunas_disponiveis = [col for col in self.nova_ordem_colunas if col in colunas_df]
+
+        transformacoes = {
+            "Nome da pessoa": lambda d: (
+                d["Nome da pessoa"].str.extract(r"^\s*(\S+)", expand=False).str.title()
+            ),
+            "Email": lambda d: d["Email"].str.replace(",", "; ", regex=False),
+        }
+        if "Nome da biblioteca" in colunas_df:
+            # Categórico: comparações por biblioteca viram códigos inteiros
+            transformacoes["Nome da biblioteca"] = (
+                lambda d: d["Nome da biblioteca"].astype("category")
+            )
+
+        self.df = (
+            self.df.loc[mask, colunas_disponiveis]
+            .assign(**transformacoes)
+            .sort_values("Nome da pessoa", kind="stable", ignore_index=True)
+        )
+
         logger.info(f"Removidos {registros_iniciais - len(self.df)} registros sem email")
-    
-    def formatar_dados(self) -> None:
-        """Formata os dados para o padrão desejado."""
-        # Ordenar por nome
-        self.df = self.df.sort_values(by="Nome da pessoa")
-        
-        # Formatar nomes (primeira letra maiúscula e apenas primeiro nome)
-        self.df["Nome da pessoa"] = self.df["Nome da pessoa"].str.title()
-        self.df["Nome da pessoa"] = self.df["Nome da pessoa"].str.split().str[0]
-        
-        # Formatar emails (substituir vírgulas por ponto e vírgula)
-        self.df["Email"] = self.df["Email"].str.replace(",", "; ", regex=False)
-        
-        logger.info("Dados formatados com sucesso")
-    
-    def reordenar_colunas(self) -> None:
-        """Reordena as colunas na ordem especificada."""
-        # Verificar quais colunas da nova ordem existem
-        colunas_disponiveis = [col for col in self.nova_ordem_colunas if col in self.df.columns]
-        
-        if colunas_disponiveis:
-            self.df = self.df[colunas_disponiveis]
-            logger.info("Colunas reordenadas com sucesso")
-        else:
-            logger.warning("Nenhuma coluna da nova ordem encontrada")
-    
+        logger.info("Dados formatados e reordenados com sucesso")
+
     def separar_por_biblioteca(self) -> Dict[str, pd.DataFrame]:
         """
         Separa os dados por biblioteca.
@@ -162,10 +229,13 @@ class ProcessadorPendencias:
         """
         planilhas = {"Base": self.df}  # Adicionar planilha base
         
+        # Um único groupby percorre a coluna uma vez, em vez de uma
+        # varredura booleana completa por biblioteca
+        grupos = dict(tuple(self.df.groupby("Nome da biblioteca", observed=True, sort=False)))
+        vazio = self.df.iloc[0:0]
+
         for nome_planilha, nome_biblioteca in self.bibliotecas.items():
-            planilhas[nome_planilha] = self.df[
-                self.df["Nome da biblioteca"] == nome_biblioteca
-            ]
+            planilhas[nome_planilha] = grupos.get(nome_biblioteca, vazio)
             logger.info(f"{nome_planilha}: {len(planilhas[nome_planilha])} registros")
         
         return planilhas
@@ -182,8 +252,36 @@ class ProcessadorPendencias:
         """
         try:
             logger.info(f"Salvando planilhas em: {self.arquivo_saida}")
-            
-            with pd.ExcelWriter(self.arquivo_saida, engine="openpyxl") as writer:
+            pd = _get_pd()
+
+            total_linhas = sum(len(df) for df in planilhas.values())
+            if total_linhas >= _LIMIAR_PARALELO:
+                # Relatórios grandes: converte cada planilha em paralelo
+                # (um processo por planilha, contornando o GIL na
+                # formatação de células) e mescla no workbook final
+                with ProcessPoolExecutor(max_workers=len(planilhas)) as executor:
+                    futuros = {
+                        nome: executor.submit(_planilha_para_bytes, df, nome)
+                        for nome, df in planilhas.items()
+                    }
+                    planilhas_bytes = {nome: futuro.result() for nome, futuro in futuros.items()}
+
+                _mesclar_planilhas(self.arquivo_saida, planilhas_bytes)
+                for nome_planilha, df_planilha in planilhas.items():
+                    logger.info(f"Planilha '{nome_planilha}' salva com {len(df_planilha)} registros")
+                logger.info("Processamento concluído com sucesso!")
+                return True
+
+            try:
+                # xlsxwriter serializa o XML diretamente, sem o grafo de
+                # células do openpyxl (constant_memory não é compatível com
+                # o to_excel coluna a coluna: linhas já despejadas seriam
+                # descartadas e a planilha sairia corrompida)
+                writer = pd.ExcelWriter(self.arquivo_saida, engine="xlsxwriter")
+            except ImportError:
+                writer = pd.ExcelWriter(self.arquivo_saida, engine="openpyxl")
+
+            with writer:
                 for nome_planilha, df_planilha in planilhas.items():
                     df_planilha.to_excel(writer, sheet_name=nome_planilha, index=False)
                     logger.info(f"Planilha '{nome_planilha}' salva com {len(df_planilha)} registros")
@@ -221,9 +319,7 @@ class ProcessadorPendencias:
         
         # Processar dados
         self.selecionar_colunas()
-        self.limpar_dados()
-        self.formatar_dados()
-        self.reordenar_colunas()
+        self.limpar_e_formatar()
         
         # Gerar relatório
         self.gerar_relatorio()
@@ -237,6 +333,7 @@ class ProcessadorPendencias:
 
 def main():
     """Função principal do script."""
+    _configurar_logging()
     try:
         processador = ProcessadorPendencias()
         sucesso = processador.processar()
@@ -12,19 +12,47 @@ Autor: Sistema de Automação
 Data: 2025
 """
 
+import atexit
+import errno
+import hashlib
+import json
 import os
+import queue
 import sys
 import time
 import shutil
 import logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
-import pandas as pd
 
 # Importar módulos locais
+from processador_base import configurar_logging_raiz
 from processador_unificado import ProcessadorUnificado
-from config import ARQUIVOS_CONFIG
+from config import ARQUIVOS_CONFIG, classificar_arquivo
+
+
+def _processar_arquivo_worker(caminho_entrada: str, tipo: str, caminho_saida: str) -> bool:
+    """
+    Processa um único arquivo num processo worker.
+
+    Função de módulo para ser picklável pelo ProcessPoolExecutor; cada
+    worker constrói o próprio ProcessadorUnificado e recebe os caminhos
+    por parâmetro, sem mutar ARQUIVOS_CONFIG nem copiar o arquivo.
+
+    Args:
+        caminho_entrada: Arquivo Excel original na pasta de entrada
+        tipo: Tipo de relatório ("emprestimos" ou "pendencias")
+        caminho_saida: Destino final do relatório processado
+
+    Returns:
+        True se processado com sucesso, False caso contrário
+    """
+    return ProcessadorUnificado().processar_tipo(
+        tipo, arquivo_entrada=caminho_entrada, arquivo_saida=caminho_saida
+    )
 
 class ProcessadorAutomatico:
     """Processador automático que monitora pastas e processa arquivos."""
@@ -51,22 +79,34 @@ class ProcessadorAutomatico:
         # Processador unificado
         self.processador = ProcessadorUnificado()
         
-        # Arquivos já processados (para evitar reprocessamento)
+        # Arquivos já processados (para evitar reprocessamento). Chaveado
+        # pelo conteúdo (hash dos primeiros 64KB + tamanho): o mesmo
+        # relatório redepositado — mesmo com outro nome ou mtime — não é
+        # processado duas vezes, e o conjunto sobrevive a reinícios via
+        # .processed.json na pasta de entrada.
         self.arquivos_processados = set()
+        self._arquivo_persistencia = self.pasta_entrada / ".processed.json"
+        self._carregar_processados()
+        atexit.register(self._salvar_processados)
+
+        # Cache de validação por (caminho, mtime, tamanho): re-varreduras
+        # de arquivos inalterados custam só um stat
+        self._validacao_cache: Dict[tuple, bool] = {}
+
+        # Cache dos hashes de conteúdo com a mesma chave de stat, para não
+        # reler os 64KB iniciais de cada arquivo a cada varredura
+        self._hash_cache: Dict[tuple, str] = {}
     
     def _configurar_logging(self):
         """Configura o sistema de logging."""
         log_file = f'processador_automatico_{datetime.now().strftime("%Y%m%d")}.log'
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+
+        # Handlers anexados uma única vez no raiz; sem isso, este
+        # basicConfig disputava com o dos processadores e cada linha de
+        # log saía por todos os FileHandlers acumulados
+        configurar_logging_raiz(log_file)
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.logger.propagate = True
     
     def _criar_pastas(self):
         """Cria as pastas necessárias para o funcionamento."""
@@ -91,49 +131,101 @@ class ProcessadorAutomatico:
         Returns:
             Tipo do arquivo ("emprestimos", "pendencias" ou None)
         """
-        nome_arquivo = arquivo.name.lower()
-        
-        # Padrões para identificar tipos de arquivo
-        padroes_emprestimos = [
-            "emprestimo", "emprestimos", "empréstimo", "empréstimos",
-            "loan", "loans", "emprestimo"
-        ]
-        
-        padroes_pendencias = [
-            "pendencia", "pendencias", "pendência", "pendências",
-            "pending", "overdue", "pendencia"
-        ]
-        
-        # Verificar padrões
-        for padrao in padroes_emprestimos:
-            if padrao in nome_arquivo:
-                return "emprestimos"
-        
-        for padrao in padroes_pendencias:
-            if padrao in nome_arquivo:
-                return "pendencias"
-        
-        return None
+        # Padrões pré-compilados em config.py (uma varredura por categoria)
+        return classificar_arquivo(arquivo.name)
     
-    def _validar_arquivo_excel(self, arquivo: Path) -> bool:
+    # Assinatura OLE2 dos arquivos .xls legados
+    _MAGIC_XLS = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+    def _chave_arquivo(self, arquivo: Path, stat_resultado) -> str:
+        """
+        Chave de identidade de um arquivo baseada no conteúdo.
+
+        Hash rápido (blake2b de 8 bytes) dos primeiros 64KB combinado com
+        o tamanho: barato de calcular e suficiente para reconhecer o mesmo
+        relatório redepositado sob outro nome. O resultado fica em cache
+        por (caminho, mtime, tamanho), então varreduras repetidas de um
+        arquivo inalterado não releem nada.
+
+        Args:
+            arquivo: Caminho do arquivo
+            stat_resultado: os.stat_result correspondente
+
+        Returns:
+            Chave no formato "<hash>:<tamanho>"
+        """
+        meta = (str(arquivo), stat_resultado.st_mtime_ns, stat_resultado.st_size)
+        chave = self._hash_cache.get(meta)
+        if chave is None:
+            digerido = hashlib.blake2b(digest_size=8)
+            with open(arquivo, "rb") as f:
+                digerido.update(f.read(65536))
+            chave = f"{digerido.hexdigest()}:{stat_resultado.st_size}"
+            self._hash_cache[meta] = chave
+        return chave
+
+    def _carregar_processados(self):
+        """Carrega o conjunto de chaves já processadas, se persistido."""
+        try:
+            with open(self._arquivo_persistencia, encoding="utf-8") as f:
+                self.arquivos_processados = set(json.load(f))
+        except (OSError, ValueError):
+            self.arquivos_processados = set()
+
+    def _salvar_processados(self):
+        """Persiste o conjunto de chaves processadas no desligamento."""
+        try:
+            with open(self._arquivo_persistencia, "w", encoding="utf-8") as f:
+                json.dump(sorted(self.arquivos_processados), f)
+        except OSError as e:
+            self.logger.warning(f"Não foi possível salvar {self._arquivo_persistencia}: {e}")
+
+    def _validar_arquivo_excel(self, arquivo: Path, stat_resultado=None) -> bool:
         """
         Valida se o arquivo é um Excel válido.
-        
+
+        Checa apenas a estrutura do contêiner (diretório central do zip
+        para .xlsx, assinatura OLE2 para .xls), sem parsear o XML inteiro
+        como um pd.read_excel faria; o resultado fica em cache por
+        (caminho, mtime, tamanho) para que re-varreduras custem um stat.
+
         Args:
             arquivo: Caminho do arquivo
-            
+            stat_resultado: os.stat_result já conhecido (ex.: do DirEntry
+                da varredura), para não repetir o stat
+
         Returns:
             True se válido, False caso contrário
         """
         try:
             # Verificar extensão
-            if arquivo.suffix.lower() not in ['.xlsx', '.xls']:
+            sufixo = arquivo.suffix.lower()
+            if sufixo not in ['.xlsx', '.xls']:
                 return False
-            
-            # Tentar abrir o arquivo
-            df = pd.read_excel(arquivo, nrows=5)  # Ler apenas 5 linhas para teste
-            return True
-            
+
+            if stat_resultado is None:
+                stat_resultado = arquivo.stat()
+            chave = (str(arquivo), stat_resultado.st_mtime_ns, stat_resultado.st_size)
+            if chave in self._validacao_cache:
+                return self._validacao_cache[chave]
+
+            if sufixo == '.xlsx':
+                # xlsx é zip+XML: a presença de xl/workbook.xml e de ao
+                # menos uma planilha valida a estrutura sem parse de XML
+                with zipfile.ZipFile(arquivo) as zf:
+                    nomes = zf.namelist()
+                valido = "xl/workbook.xml" in nomes and any(
+                    nome.startswith("xl/worksheets/sheet") for nome in nomes
+                )
+            else:
+                with open(arquivo, "rb") as f:
+                    valido = f.read(8) == self._MAGIC_XLS
+
+            self._validacao_cache[chave] = valido
+            if not valido:
+                self.logger.warning(f"Arquivo inválido {arquivo}: estrutura não reconhecida")
+            return valido
+
         except Exception as e:
             self.logger.warning(f"Arquivo inválido {arquivo}: {e}")
             return False
@@ -154,72 +246,23 @@ class ProcessadorAutomatico:
             else:
                 # Mover para pasta de erros
                 destino_final = self.pasta_erros / origem.name
-            
-            shutil.move(str(origem), str(destino_final))
+
+            try:
+                # Mesmo sistema de arquivos por construção (subpastas de
+                # Entrada): replace é um único rename de inode, atômico e
+                # com sobrescrita, sem o stat extra e o risco de fallback
+                # copy+unlink do shutil.move
+                origem.replace(destino_final)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Destino em outro dispositivo: só aí vale a cópia
+                shutil.move(str(origem), str(destino_final))
             self.logger.info(f"Arquivo movido: {origem.name} -> {destino_final}")
-            
+
         except Exception as e:
             self.logger.error(f"Erro ao mover arquivo {origem}: {e}")
     
-    def _processar_arquivo(self, arquivo: Path) -> bool:
-        """
-        Processa um arquivo específico.
-        
-        Args:
-            arquivo: Caminho do arquivo
-            
-        Returns:
-            True se processado com sucesso, False caso contrário
-        """
-        try:
-            self.logger.info(f"Iniciando processamento: {arquivo.name}")
-            
-            # Identificar tipo do arquivo
-            tipo = self._identificar_tipo_arquivo(arquivo)
-            
-            if not tipo:
-                self.logger.warning(f"Não foi possível identificar o tipo do arquivo: {arquivo.name}")
-                return False
-            
-            # Copiar arquivo para processamento temporário
-            arquivo_temp = Path(f"temp_{arquivo.name}")
-            shutil.copy2(arquivo, arquivo_temp)
-            
-            # Modificar configuração temporariamente
-            config_original = ARQUIVOS_CONFIG[tipo]["entrada"]
-            ARQUIVOS_CONFIG[tipo]["entrada"] = arquivo_temp.name
-            
-            # Processar arquivo
-            sucesso = self.processador.processar_tipo(tipo)
-            
-            # Restaurar configuração
-            ARQUIVOS_CONFIG[tipo]["entrada"] = config_original
-            
-            # Remover arquivo temporário
-            if arquivo_temp.exists():
-                arquivo_temp.unlink()
-            
-            if sucesso:
-                # Mover arquivo processado para pasta de saída
-                arquivo_saida = ARQUIVOS_CONFIG[tipo]["saida"]
-                if Path(arquivo_saida).exists():
-                    destino_final = self.pasta_saida / f"{tipo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{arquivo_saida}"
-                    shutil.move(arquivo_saida, destino_final)
-                    self.logger.info(f"Arquivo processado salvo: {destino_final}")
-                
-                # Mover arquivo original para pasta de processados
-                self._mover_arquivo(arquivo, self.pasta_processados, sucesso=True)
-                return True
-            else:
-                # Mover arquivo para pasta de erros
-                self._mover_arquivo(arquivo, self.pasta_erros, sucesso=False)
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"Erro ao processar {arquivo}: {e}")
-            self._mover_arquivo(arquivo, self.pasta_erros, sucesso=False)
-            return False
-    
     def _encontrar_arquivos_novos(self) -> List[Path]:
         """
         Encontra arquivos novos na pasta de entrada.
@@ -227,17 +270,33 @@ class ProcessadorAutomatico:
         Returns:
             Lista de arquivos novos para processar
         """
-        arquivos_novos = []
-        
-        for arquivo in self.pasta_entrada.glob("*"):
-            # Ignorar pastas e arquivos já processados
-            if (arquivo.is_file() and 
-                arquivo not in self.arquivos_processados and
-                self._validar_arquivo_excel(arquivo)):
-                
-                arquivos_novos.append(arquivo)
-        
-        return arquivos_novos
+        candidatos = []
+
+        # os.scandir devolve DirEntry com o stat em cache da leitura do
+        # diretório: um syscall por arquivo em vez de stat para is_file +
+        # stat para a chave + stat na validação
+        with os.scandir(self.pasta_entrada) as entradas:
+            for entrada in entradas:
+                # Subpastas conhecidas e arquivos ocultos (ex.: o próprio
+                # .processed.json) descartados pelo nome (comparação de
+                # string, sem syscall de is_dir)
+                if entrada.name in ("Processados", "Erros") or entrada.name.startswith("."):
+                    continue
+                if not entrada.is_file(follow_symlinks=False):
+                    continue
+
+                stat_resultado = entrada.stat()
+                arquivo = Path(entrada.path)
+                # Chave de conteúdo rejeitada antes da validação: a
+                # checagem barata vem primeiro
+                if (self._chave_arquivo(arquivo, stat_resultado) not in self.arquivos_processados and
+                        self._validar_arquivo_excel(arquivo, stat_resultado)):
+                    candidatos.append((stat_resultado.st_size, arquivo))
+
+        # Menores primeiro: sob o pool de processos, os arquivos pequenos
+        # terminam cedo em vez de esperarem atrás de um gigante
+        candidatos.sort(key=lambda item: item[0])
+        return [arquivo for _, arquivo in candidatos]
     
     def processar_pasta(self):
         """Processa todos os arquivos novos na pasta de entrada."""
@@ -250,34 +309,159 @@ class ProcessadorAutomatico:
             return
         
         self.logger.info(f"Encontrados {len(arquivos_novos)} arquivos novos para processar.")
-        
-        for arquivo in arquivos_novos:
-            self.logger.info(f"Processando: {arquivo.name}")
-            
-            sucesso = self._processar_arquivo(arquivo)
-            
-            if sucesso:
-                self.arquivos_processados.add(arquivo)
-                self.logger.info(f"✅ {arquivo.name} processado com sucesso!")
-            else:
-                self.logger.error(f"❌ Falha no processamento de {arquivo.name}")
+
+        # Cada arquivo é um pipeline Excel -> Excel independente e limitado
+        # por CPU: um processo por arquivo escala quase linearmente com os
+        # núcleos em lotes grandes
+        tarefas = []
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(arquivos_novos))
+        ) as executor:
+            for arquivo in arquivos_novos:
+                tipo = self._identificar_tipo_arquivo(arquivo)
+
+                if not tipo:
+                    self.logger.warning(
+                        f"Não foi possível identificar o tipo do arquivo: {arquivo.name}"
+                    )
+                    self._mover_arquivo(arquivo, self.pasta_erros, sucesso=False)
+                    continue
+
+                # O stem do arquivo de entrada entra no nome: arquivos do
+                # mesmo tipo processados no mesmo segundo não disputam o
+                # mesmo destino (os nomes de entrada são únicos na pasta)
+                destino = self.pasta_saida / (
+                    f"{tipo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{arquivo.stem}_"
+                    f"{ARQUIVOS_CONFIG[tipo]['saida'].name}"
+                )
+                # Chave capturada antes do processamento: depois dele o
+                # arquivo já foi movido para Processados/Erros
+                chave = self._chave_arquivo(arquivo, arquivo.stat())
+                futuro = executor.submit(
+                    _processar_arquivo_worker, str(arquivo), tipo, str(destino)
+                )
+                tarefas.append((arquivo, chave, futuro))
+
+            for arquivo, chave, futuro in tarefas:
+                try:
+                    sucesso = futuro.result()
+                except Exception as e:
+                    self.logger.error(f"Erro ao processar {arquivo}: {e}")
+                    sucesso = False
+
+                if sucesso:
+                    self.arquivos_processados.add(chave)
+                    self._mover_arquivo(arquivo, self.pasta_processados, sucesso=True)
+                    self.logger.info(f"✅ {arquivo.name} processado com sucesso!")
+                else:
+                    self._mover_arquivo(arquivo, self.pasta_erros, sucesso=False)
+                    self.logger.error(f"❌ Falha no processamento de {arquivo.name}")
     
+    def _aguardar_arquivo_estavel(self, arquivo: Path, espera: float = 0.2) -> bool:
+        """
+        Aguarda o tamanho do arquivo estabilizar antes de processá-lo.
+
+        Eventos de criação chegam antes de o upload terminar; dois stats
+        espaçados evitam ler um arquivo ainda sendo escrito.
+
+        Args:
+            arquivo: Caminho do arquivo recém-criado
+            espera: Intervalo entre os dois stats, em segundos
+
+        Returns:
+            True se o arquivo existe e parou de crescer
+        """
+        try:
+            tamanho = arquivo.stat().st_size
+            while True:
+                time.sleep(espera)
+                tamanho_atual = arquivo.stat().st_size
+                if tamanho_atual == tamanho:
+                    return True
+                tamanho = tamanho_atual
+        except OSError:
+            return False
+
+    def _monitorar_por_eventos(self, intervalo: int) -> bool:
+        """
+        Monitora a pasta de entrada via eventos do sistema de arquivos.
+
+        Usa o watchdog (inotify no Linux, ReadDirectoryChangesW no Windows,
+        FSEvents no macOS): em repouso não há varredura nem parse de Excel,
+        e a detecção de arquivos novos é quase imediata. Os eventos apenas
+        enfileiram os caminhos; o consumo acontece nesta thread, após a
+        espera de estabilidade, reaproveitando processar_pasta.
+
+        Args:
+            intervalo: Timeout da fila (também usado pelo PollingObserver)
+
+        Returns:
+            True se o monitoramento rodou por eventos; False se o watchdog
+            não está instalado (o chamador cai no polling)
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        fila: "queue.Queue[Path]" = queue.Queue()
+
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    fila.put(Path(event.src_path))
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    fila.put(Path(event.dest_path))
+
+        observador = Observer()
+        observador.schedule(_Handler(), str(self.pasta_entrada), recursive=False)
+        observador.start()
+        self.logger.info("Monitoramento por eventos do sistema de arquivos ativo")
+
+        # Varredura inicial: arquivos que já estavam na pasta não geram evento
+        self.processar_pasta()
+
+        try:
+            while True:
+                try:
+                    arquivo = fila.get(timeout=intervalo)
+                except queue.Empty:
+                    continue
+                if arquivo.parent != self.pasta_entrada:
+                    continue
+                if self._aguardar_arquivo_estavel(arquivo):
+                    self.processar_pasta()
+        finally:
+            observador.stop()
+            observador.join()
+
     def monitorar_pasta(self, intervalo: int = 30):
         """
         Monitora continuamente a pasta de entrada.
-        
+
+        Prefere eventos do sistema de arquivos (watchdog); sem a dependência
+        instalada, mantém a varredura periódica original.
+
         Args:
-            intervalo: Intervalo em segundos entre verificações
+            intervalo: Intervalo em segundos entre verificações (no modo
+                por eventos, timeout de espera da fila)
         """
         self.logger.info(f"Iniciando monitoramento da pasta: {self.pasta_entrada}")
         self.logger.info(f"Arquivos processados serão salvos em: {self.pasta_saida}")
         self.logger.info(f"Pressione Ctrl+C para parar o monitoramento")
-        
+
         try:
+            if self._monitorar_por_eventos(intervalo):
+                return
+
+            self.logger.info("watchdog não instalado; usando varredura periódica")
             while True:
                 self.processar_pasta()
                 time.sleep(intervalo)
-                
+
         except KeyboardInterrupt:
             self.logger.info("Monitoramento interrompido pelo usuário.")
     
@@ -10,11 +10,57 @@ de relatórios de bibliotecas.
 
 import pandas as pd
 import logging
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from typing import Dict, List, Optional
 import sys
 from abc import ABC, abstractmethod
 
+# Copy-on-write (pandas >= 2.0): fatias e reatribuições compartilham os
+# buffers do frame original até uma mutação real, em vez de copiar tudo
+# adiantado — corta o pico de memória das reatribuições encadeadas de
+# self.df nos passos de limpeza. Ignorado em versões sem a opção.
+try:
+    pd.set_option("mode.copy_on_write", True)
+except (KeyError, AttributeError):
+    pass
+
+# Tamanho dos blocos de linhas lidos por vez em carregar_dados_iter:
+# grande o suficiente para amortizar o overhead por chamada do parse,
+# pequeno o suficiente para limitar o pico de memória por bloco.
+_CHUNK_LINHAS = 50_000
+
+
+def configurar_logging_raiz(log_file: str) -> None:
+    """
+    Configura os handlers do logger raiz uma única vez.
+
+    O basicConfig por instância acumulava um FileHandler novo a cada
+    processador construído (cada linha de log saía multiplicada por N
+    handlers); aqui a configuração só acontece se o raiz ainda não tem
+    handlers, e o arquivo é rotacionado para não crescer sem limite em
+    monitoramentos longos.
+
+    Args:
+        log_file: Caminho do arquivo de log
+    """
+    raiz = logging.getLogger()
+    if raiz.handlers:
+        return
+
+    raiz.setLevel(logging.INFO)
+    formato = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    arquivo = RotatingFileHandler(
+        log_file, maxBytes=10_000_000, backupCount=5, encoding='utf-8'
+    )
+    arquivo.setFormatter(formato)
+    raiz.addHandler(arquivo)
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(formato)
+    raiz.addHandler(console)
+
 class ProcessadorBase(ABC):
     """Classe base abstrata para processamento de relatórios."""
     
@@ -29,6 +75,9 @@ class ProcessadorBase(ABC):
         self.arquivo_entrada = arquivo_entrada
         self.arquivo_saida = arquivo_saida
         self.df = None
+        # Esquema esperado (definido pelas subclasses): quando presente,
+        # restringe a leitura às colunas de interesse via usecols
+        self.colunas_esperadas: Optional[List[str]] = None
         
         # Configurar logging específico para cada tipo de processamento
         self._configurar_logging()
@@ -36,22 +85,17 @@ class ProcessadorBase(ABC):
     def _configurar_logging(self):
         """Configura o sistema de logging."""
         nome_classe = self.__class__.__name__.lower()
-        log_file = f'processamento_{nome_classe}.log'
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        configurar_logging_raiz(f'processamento_{nome_classe}.log')
+
+        # Logger nomeado por classe, propagando para os handlers do raiz:
+        # nenhum handler novo é anexado por instância
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.logger.propagate = True
     
     def carregar_dados(self) -> bool:
         """
         Carrega os dados do arquivo Excel.
-        
+
         Returns:
             bool: True se carregado com sucesso, False caso contrário
         """
@@ -59,15 +103,91 @@ class ProcessadorBase(ABC):
             if not Path(self.arquivo_entrada).exists():
                 self.logger.error(f"Arquivo não encontrado: {self.arquivo_entrada}")
                 return False
-                
+
             self.logger.info(f"Carregando dados de: {self.arquivo_entrada}")
-            self.df = pd.read_excel(self.arquivo_entrada)
+            blocos = list(self.carregar_dados_iter())
+            if len(blocos) == 1:
+                self.df = blocos[0]
+            else:
+                self.df = pd.concat(blocos, copy=False, ignore_index=True)
+
+            # Dtype categórico: as comparações e o groupby por biblioteca
+            # passam a operar sobre códigos inteiros em vez de strings
+            if "Nome da biblioteca" in self.df.columns:
+                self.df["Nome da biblioteca"] = self.df["Nome da biblioteca"].astype("category")
+
+            # Strings com backend Arrow: contains/replace/comparações
+            # rodam em C sem box de objetos Python (segue em object se o
+            # pyarrow não estiver instalado)
+            try:
+                for coluna in ("Nome da pessoa", "Email"):
+                    if coluna in self.df.columns:
+                        self.df[coluna] = self.df[coluna].astype("string[pyarrow]")
+            except (ImportError, TypeError):
+                pass
+
             self.logger.info(f"Dados carregados: {len(self.df)} registros")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Erro ao carregar dados: {e}")
             return False
+
+    def carregar_dados_iter(self, chunk: int = _CHUNK_LINHAS):
+        """
+        Itera o arquivo Excel de entrada em blocos de linhas.
+
+        Mantém um único pd.ExcelFile aberto e lê fatias de `chunk` linhas
+        por vez, de modo que quem consome os blocos diretamente nunca
+        materializa a planilha inteira; o primeiro bloco é sempre emitido
+        (mesmo vazio) para preservar as colunas do cabeçalho.
+
+        Args:
+            chunk: Número de linhas por bloco
+
+        Yields:
+            pd.DataFrame com até `chunk` linhas
+        """
+        try:
+            # Engine calamine (Rust): parseia o xlsx em streaming sem
+            # materializar o DOM inteiro do openpyxl, o que reduz muito
+            # tempo e memória em planilhas grandes
+            xl = pd.ExcelFile(self.arquivo_entrada, engine="calamine")
+        except (ImportError, ValueError):
+            # python-calamine ausente ou pandas < 2.2 (e o caminho .xls,
+            # que continua no xlrd): engine padrão
+            xl = pd.ExcelFile(self.arquivo_entrada)
+
+        try:
+            # Cabeçalho lido uma única vez (nrows=0) e cruzado com o
+            # esquema esperado: o usecols resultante vale para todos os
+            # blocos e as colunas irrelevantes nem passam pelo parser
+            usecols = None
+            if self.colunas_esperadas is not None:
+                esperadas = set(self.colunas_esperadas)
+                usecols = [c for c in xl.parse(nrows=0).columns if c in esperadas]
+                if not usecols:
+                    # Nenhuma coluna esperada no arquivo: leitura integral
+                    # para a validação reportar o problema normalmente
+                    usecols = None
+
+            inicio = 0
+            while True:
+                if inicio == 0:
+                    bloco = xl.parse(nrows=chunk, usecols=usecols)
+                else:
+                    bloco = xl.parse(
+                        skiprows=range(1, inicio + 1), nrows=chunk, usecols=usecols
+                    )
+
+                if inicio and bloco.empty:
+                    break
+                yield bloco
+                if len(bloco) < chunk:
+                    break
+                inicio += len(bloco)
+        finally:
+            xl.close()
     
     def validar_colunas(self, colunas_necessarias: List[str]) -> bool:
         """
@@ -79,44 +199,80 @@ class ProcessadorBase(ABC):
         Returns:
             bool: True se todas as colunas existem, False caso contrário
         """
-        colunas_faltantes = [col for col in colunas_necessarias if col not in self.df.columns]
-        
+        # Diferença de conjuntos: uma interseção de hash em vez de um
+        # teste "in" no Index por coluna exigida
+        colunas_faltantes = set(colunas_necessarias) - set(self.df.columns)
+
         if colunas_faltantes:
-            self.logger.error(f"Colunas faltantes: {colunas_faltantes}")
+            self.logger.error(f"Colunas faltantes: {sorted(colunas_faltantes)}")
             self.logger.info(f"Colunas disponíveis: {list(self.df.columns)}")
             return False
-            
+
         self.logger.info("Todas as colunas necessárias estão presentes")
         return True
     
     def formatar_nomes(self) -> None:
         """Formata os nomes das pessoas (primeira letra maiúscula e apenas primeiro nome)."""
         if "Nome da pessoa" in self.df.columns:
-            # Primeiro aplicar title() para capitalizar
-            self.df["Nome da pessoa"] = self.df["Nome da pessoa"].str.title()
-            # Depois extrair apenas o primeiro nome
-            self.df["Nome da pessoa"] = self.df["Nome da pessoa"].str.split().str[0]
+            # Extrai o primeiro token numa única varredura de regex e só
+            # então capitaliza: uma passagem em vez de title + split + [0],
+            # sem a lista intermediária de pedaços por linha
+            self.df["Nome da pessoa"] = (
+                self.df["Nome da pessoa"]
+                .str.extract(r"^\s*(\S+)", expand=False)
+                .str.title()
+            )
             self.logger.info("Nomes formatados com sucesso (apenas primeiro nome)")
     
     def ordenar_por_nome(self) -> None:
         """Ordena os dados por nome da pessoa."""
         if "Nome da pessoa" in self.df.columns:
-            self.df = self.df.sort_values(by="Nome da pessoa")
+            # Primeiros nomes têm cardinalidade baixa: em dtype categórico
+            # o sort compara o vetor de códigos inteiros em vez de strings
+            # Python, e mergesort (estável) preserva a ordem relativa de
+            # registros com o mesmo nome entre execuções
+            self.df["Nome da pessoa"] = self.df["Nome da pessoa"].astype("category")
+            self.df = self.df.sort_values(
+                by="Nome da pessoa", kind="mergesort", na_position="last"
+            )
             self.logger.info("Dados ordenados por nome")
     
-    def remover_duplicatas(self) -> None:
-        """Remove registros duplicados."""
+    def remover_duplicatas(self, subset: Optional[List[str]] = None) -> None:
+        """
+        Remove registros duplicados.
+
+        Args:
+            subset: Colunas que formam a chave de identidade; com uma chave
+                declarada o hash roda só sobre essas colunas em vez de
+                todas (colunas ausentes são ignoradas). Sem subset, o
+                comportamento original de linha inteira é mantido.
+        """
         registros_antes = len(self.df)
-        self.df = self.df.drop_duplicates()
+
+        if subset:
+            subset = [col for col in subset if col in self.df.columns]
+
+        # ignore_index descarta o hash do índice e devolve um RangeIndex;
+        # keep="first" é o padrão, explicitado para documentar a intenção
+        self.df = self.df.drop_duplicates(
+            subset=subset or None, keep="first", ignore_index=True
+        )
         registros_removidos = registros_antes - len(self.df)
-        
+
         if registros_removidos > 0:
             self.logger.info(f"Removidas {registros_removidos} duplicatas")
     
     def formatar_emails(self) -> None:
         """Formata os emails (substitui vírgulas por ponto e vírgula)."""
         if "Email" in self.df.columns:
-            self.df["Email"] = self.df["Email"].str.replace(",", "; ", regex=False)
+            # Pré-checagem barata (strstr em C): no caso comum sem vírgula
+            # nenhuma, a coluna não é realocada; havendo vírgulas, o
+            # replace roda só nas linhas marcadas
+            mask = self.df["Email"].str.contains(",", regex=False, na=False)
+            if mask.any():
+                self.df.loc[mask, "Email"] = (
+                    self.df.loc[mask, "Email"].str.replace(",", "; ", regex=False)
+                )
             self.logger.info("Emails formatados com sucesso")
     
     def separar_por_biblioteca(self, bibliotecas: Dict[str, str]) -> Dict[str, pd.DataFrame]:
@@ -129,14 +285,25 @@ class ProcessadorBase(ABC):
         Returns:
             Dict com DataFrames separados por biblioteca
         """
-        planilhas = {}
-        
-        for nome_planilha, nome_biblioteca in bibliotecas.items():
-            planilhas[nome_planilha] = self.df[
-                self.df["Nome da biblioteca"] == nome_biblioteca
-            ]
-            self.logger.info(f"{nome_planilha}: {len(planilhas[nome_planilha])} registros")
-        
+        # groupby particiona a coluna numa única passagem, em vez de uma
+        # varredura booleana completa por biblioteca; observed=True ignora
+        # categorias sem registros e sort=False preserva a ordem imposta
+        # pelo dicionário de bibliotecas
+        grupos = dict(tuple(
+            self.df.groupby("Nome da biblioteca", observed=True, sort=False)
+        ))
+        vazio = self.df.iloc[0:0]
+
+        planilhas = {
+            nome_planilha: grupos.get(nome_biblioteca, vazio)
+            for nome_planilha, nome_biblioteca in bibliotecas.items()
+        }
+
+        # Uma única linha de log agregada: um lock + um write por split,
+        # em vez de um por biblioteca
+        contagens = {nome: len(df) for nome, df in planilhas.items()}
+        self.logger.info("Registros por planilha: %s", contagens)
+
         return planilhas
     
     def salvar_planilhas(self, planilhas: Dict[str, pd.DataFrame]) -> bool:
@@ -151,8 +318,17 @@ class ProcessadorBase(ABC):
         """
         try:
             self.logger.info(f"Salvando planilhas em: {self.arquivo_saida}")
-            
-            with pd.ExcelWriter(self.arquivo_saida, engine="openpyxl") as writer:
+
+            try:
+                # xlsxwriter: gera o XML diretamente, sem montar o grafo
+                # de objetos Cell do openpyxl (constant_memory não serve
+                # aqui — o to_excel escreve coluna a coluna e o modo
+                # descarta linhas já despejadas, corrompendo a planilha)
+                writer_ctx = pd.ExcelWriter(self.arquivo_saida, engine="xlsxwriter")
+            except ImportError:
+                writer_ctx = pd.ExcelWriter(self.arquivo_saida, engine="openpyxl")
+
+            with writer_ctx as writer:
                 for nome_planilha, df_planilha in planilhas.items():
                     df_planilha.to_excel(writer, sheet_name=nome_planilha, index=False)
                     self.logger.info(f"Planilha '{nome_planilha}' salva com {len(df_planilha)} registros")
@@ -171,14 +347,20 @@ class ProcessadorBase(ABC):
         Args:
             bibliotecas: Dicionário com mapeamento de bibliotecas
         """
-        self.logger.info("=== RELATÓRIO DE PROCESSAMENTO ===")
-        self.logger.info(f"Total de registros processados: {len(self.df)}")
-        self.logger.info(f"Colunas no dataset: {list(self.df.columns)}")
-        
-        # Estatísticas por biblioteca
-        for nome_biblioteca in bibliotecas.values():
-            count = len(self.df[self.df["Nome da biblioteca"] == nome_biblioteca])
-            self.logger.info(f"{nome_biblioteca}: {count} registros")
+        # Estatísticas por biblioteca: value_counts conta tudo numa única
+        # passagem, e o relatório inteiro sai numa só emissão de log em
+        # vez de uma linha (lock + write) por biblioteca
+        contagens = self.df["Nome da biblioteca"].value_counts()
+        linhas = [
+            "=== RELATÓRIO DE PROCESSAMENTO ===",
+            f"Total de registros processados: {len(self.df)}",
+            f"Colunas no dataset: {list(self.df.columns)}",
+        ]
+        linhas.extend(
+            f"{nome_biblioteca}: {contagens.get(nome_biblioteca, 0)} registros"
+            for nome_biblioteca in bibliotecas.values()
+        )
+        self.logger.info("\n".join(linhas))
     
     @abstractmethod
     def processar_dados_especificos(self) -> None:
@@ -8,15 +8,25 @@ Versão simplificada para executável que processa arquivos
 automaticamente na pasta de entrada.
 """
 
+import io
 import os
+from functools import partial
 import sys
-import time
 import shutil
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 
+# Copy-on-write (pandas >= 2.0): as fatias intermediárias da limpeza
+# viram vistas preguiçosas em vez de cópias, reduzindo o pico de RSS;
+# sem efeito em versões que não conhecem a opção
+try:
+    pd.set_option("mode.copy_on_write", True)
+except (KeyError, AttributeError):
+    pass
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +38,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Limite de linhas a partir do qual vale a pena paralelizar a conversão
+# das planilhas (abaixo disso o custo de criar o pool domina)
+_LIMIAR_PARALELO = 50_000
+
+# Sinalizador setado pelo initializer do pool do lote: dentro de um
+# worker a gravação fica serial em vez de abrir um segundo pool
+# (workers de ProcessPoolExecutor não são daemônicos, então nada impede
+# o pool aninhado — mas ele multiplicaria os processos por cpu × abas)
+_em_worker_do_lote = False
+
+
+def _marcar_worker_do_lote():
+    """Marca o processo atual como worker do lote (initializer do pool)."""
+    global _em_worker_do_lote
+    _em_worker_do_lote = True
+
+
+def _planilha_para_bytes(df, nome_planilha):
+    """Converte um DataFrame em bytes .xlsx (roda nos processos workers)."""
+    buffer = io.BytesIO()
+    df.to_excel(buffer, sheet_name=nome_planilha, index=False)
+    return buffer.getvalue()
+
+
+def _mesclar_planilhas(caminho, planilhas_bytes):
+    """Mescla as planilhas convertidas em paralelo num único workbook."""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for nome, dados in planilhas_bytes.items():
+        origem = openpyxl.load_workbook(io.BytesIO(dados), read_only=True)
+        destino = workbook.create_sheet(title=nome)
+        for linha in origem.active.iter_rows(values_only=True):
+            destino.append(linha)
+        origem.close()
+    workbook.save(caminho)
+
+
+def _salvar_planilhas(arquivo_saida, planilhas):
+    """
+    Grava as planilhas num único arquivo xlsx.
+
+    Acima de _LIMIAR_PARALELO linhas, cada planilha é serializada em
+    bytes num processo worker e o merge final roda em streaming (mesmo
+    esquema dos scripts standalone); abaixo disso — ou quando já estamos
+    dentro de um worker do lote, que não deve abrir outro pool — escrita
+    serial via xlsxwriter, com fallback openpyxl.
+
+    Args:
+        arquivo_saida: Caminho do arquivo xlsx de saída
+        planilhas: Dicionário nome da planilha -> DataFrame
+    """
+    total_linhas = sum(len(df) for df in planilhas.values())
+
+    if total_linhas >= _LIMIAR_PARALELO and not _em_worker_do_lote:
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(planilhas))
+        ) as executor:
+            futuros = {
+                nome: executor.submit(_planilha_para_bytes, df, nome)
+                for nome, df in planilhas.items()
+            }
+            planilhas_bytes = {nome: futuro.result() for nome, futuro in futuros.items()}
+        _mesclar_planilhas(arquivo_saida, planilhas_bytes)
+        return
+
+    try:
+        # Sem constant_memory: o to_excel escreve coluna a coluna e o
+        # modo descarta linhas já despejadas, corrompendo a saída;
+        # desligar a detecção de fórmulas/URLs continua valendo (remove
+        # um regex por célula de texto)
+        writer_ctx = pd.ExcelWriter(
+            arquivo_saida,
+            engine="xlsxwriter",
+            engine_kwargs={"options": {
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+            }},
+        )
+    except ImportError:
+        writer_ctx = pd.ExcelWriter(arquivo_saida, engine="openpyxl")
+
+    with writer_ctx as writer:
+        for nome_planilha, df_planilha in planilhas.items():
+            df_planilha.to_excel(writer, sheet_name=nome_planilha, index=False)
+
+
 class ProcessadorSimples:
     """Processador simples para executável."""
     
@@ -66,56 +163,118 @@ class ProcessadorSimples:
         else:
             return "desconhecido"
     
-    def _processar_emprestimos(self, arquivo: Path) -> bool:
+    def _processar_emprestimos(self, arquivo: Path, timestamp: str = None) -> bool:
         """Processa arquivo de empréstimos."""
         try:
             logger.info(f"Processando empréstimos: {arquivo.name}")
             
-            # Carregar dados
-            df = pd.read_excel(arquivo)
-            
             # Colunas necessárias
             colunas = ['Nome da pessoa', 'Gênero', 'Nome da biblioteca', 'Email', 'Nome pessoa empréstimo']
-            
+            desejadas = frozenset(colunas)
+
+            # Carregar dados: usecols descarta as colunas irrelevantes já
+            # no parser — as células fora da seleção nem são convertidas.
+            # Engine calamine (Rust, streaming) quando disponível; sem ela
+            # (ou para .xls), a engine padrão do pandas.
+            try:
+                df = pd.read_excel(
+                    arquivo, usecols=lambda coluna: coluna in desejadas,
+                    engine="calamine"
+                )
+            except (ImportError, ValueError):
+                df = pd.read_excel(arquivo, usecols=lambda coluna: coluna in desejadas)
+
             # Verificar colunas
             colunas_faltantes = [col for col in colunas if col not in df.columns]
             if colunas_faltantes:
                 logger.error(f"Colunas faltantes: {colunas_faltantes}")
                 return False
-            
-            # Selecionar colunas
+
+            # Selecionar colunas (garante a ordem esperada)
             df = df[colunas]
-            
-            # Limpar dados
-            df = df[
-                (df["Email"].notna()) & 
-                (df["Email"].astype(str).str.strip() != "") &
-                (df["Email"].astype(str).str.strip() != "nan")
-            ]
+
+            # Cardinalidade minúscula (3 bibliotecas, 2 gêneros): em dtype
+            # categórico as comparações e o groupby rodam sobre códigos
+            # int8 em vez de strings
+            for coluna in ("Nome da biblioteca", "Gênero"):
+                df[coluna] = df[coluna].astype("category")
+
+            # Strings com backend Arrow: strip/contains/replace rodam em C
+            # sem box de objetos Python (segue em object sem o pyarrow)
+            try:
+                for coluna in ("Nome da pessoa", "Email"):
+                    df[coluna] = df[coluna].astype("string[pyarrow]")
+            except (ImportError, TypeError):
+                pass
+
+            # Limpar dados: strip calculado uma única vez e reutilizado
+            # nos três predicados, em vez de duas conversões astype(str)
+            # com strip sobre a coluna inteira
+            email = df["Email"]
+            if email.dtype == object:
+                # Só o caminho object precisa da conversão; em
+                # string[pyarrow] o strip já roda no kernel Arrow
+                email = email.astype("string")
+            email = email.str.strip()
+            mask = email.notna() & (email != "") & (email.str.lower() != "nan")
+            df = df.loc[mask]
             df = df[df["Nome pessoa empréstimo"] != "Bibinternet"]
             df = df.drop(columns=["Nome pessoa empréstimo"])
-            df = df.drop_duplicates()
-            
-            # Formatar dados
-            df = df.sort_values(by="Nome da pessoa")
-            # Converter para minúsculo primeiro, depois aplicar title() para pegar apenas primeira letra maiúscula
-            df["Nome da pessoa"] = df["Nome da pessoa"].str.lower().str.title()
-            df["Nome da pessoa"] = df["Nome da pessoa"].str.split().str[0]
-            df["Gênero"] = df["Gênero"].replace({"M": "o", "F": "a"})
-            df["Email"] = df["Email"].str.replace(",", "; ", regex=False)
-            
-            # Separar por biblioteca
+            # Chave natural do registro: hash só sobre as colunas de
+            # identidade (Gênero é categórico derivado da pessoa e não
+            # diferencia registros); ignore_index dispensa o hash do índice
+            df = df.drop_duplicates(
+                subset=["Email", "Nome da biblioteca", "Nome da pessoa"],
+                ignore_index=True,
+            )
+            
+            # Formatar dados (a ordenação acontece uma única vez depois
+            # da formatação, logo antes da separação)
+            # Primeiro token extraído numa única varredura de regex e só
+            # então capitalizado (title() já rebaixa o resto do token, o
+            # mesmo efeito do lower().title() anterior) — uma passagem em
+            # vez de quatro acessores .str encadeados
+            df["Nome da pessoa"] = (
+                df["Nome da pessoa"].str.extract(r"^\s*(\S+)", expand=False).str.title()
+            )
+            # rename_categories reescreve só o dicionário de categorias
+            # ("M"/"F"), sem tocar nos códigos linha a linha
+            df["Gênero"] = df["Gênero"].cat.rename_categories({"M": "o", "F": "a"})
+            # Pré-checagem barata em C: sem vírgulas (caso comum), a
+            # coluna não é realocada; com vírgulas, o replace roda só nas
+            # linhas marcadas (em string[pyarrow] ele despacha para o
+            # kernel C++ do Arrow)
+            com_virgula = df["Email"].str.contains(",", regex=False, na=False)
+            if com_virgula.any():
+                df.loc[com_virgula, "Email"] = (
+                    df.loc[com_virgula, "Email"].str.replace(",", "; ", regex=False)
+                )
+            
+            # Ordenar uma única vez, já sobre os primeiros nomes curtos
+            # (comparações mais baratas que nos nomes completos); o sort
+            # estável mantém a ordem original entre nomes iguais e a
+            # separação abaixo herda a ordenação em todas as planilhas
+            df = df.sort_values(by="Nome da pessoa", kind="mergesort", ignore_index=True)
+
+            # Separar por biblioteca: groupby particiona numa única
+            # passagem, em vez de uma varredura booleana por biblioteca
             planilhas = {"Base": df}
+            grupos = dict(tuple(df.groupby("Nome da biblioteca", observed=True, sort=False)))
+            vazio = df.iloc[0:0]
             for nome_planilha, nome_biblioteca in self.bibliotecas.items():
-                planilhas[nome_planilha] = df[df["Nome da biblioteca"] == nome_biblioteca]
-            
-            # Salvar resultados
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            arquivo_saida = self.pasta_saida / f"emprestimos_{timestamp}.xlsx"
-            
-            with pd.ExcelWriter(arquivo_saida, engine="openpyxl") as writer:
-                for nome_planilha, df_planilha in planilhas.items():
-                    df_planilha.to_excel(writer, sheet_name=nome_planilha, index=False)
+                planilhas[nome_planilha] = grupos.get(nome_biblioteca, vazio)
+
+            # Salvar resultados (timestamp vem do lote quando o arquivo é
+            # processado via processar_pasta; gerado aqui em chamada
+            # avulsa). O stem da entrada diferencia as saídas de arquivos
+            # do mesmo tipo que compartilham o timestamp do lote.
+            if timestamp is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            arquivo_saida = self.pasta_saida / f"emprestimos_{timestamp}_{arquivo.stem}.xlsx"
+            
+            # Conversão paralela por planilha acima do limiar, escrita
+            # serial em streaming abaixo dele
+            _salvar_planilhas(arquivo_saida, planilhas)
             
             logger.info(f"Empréstimos processados: {arquivo_saida}")
             return True
@@ -124,40 +283,76 @@ class ProcessadorSimples:
             logger.error(f"Erro ao processar empréstimos: {e}")
             return False
     
-    def _processar_pendencias(self, arquivo: Path) -> bool:
+    def _processar_pendencias(self, arquivo: Path, timestamp: str = None) -> bool:
         """Processa arquivo de pendências."""
         try:
             logger.info(f"Processando pendências: {arquivo.name}")
             
-            # Carregar dados
-            df = pd.read_excel(arquivo)
-            
             # Colunas necessárias
-            colunas = ["Nome da pessoa", "Email", "Data de empréstimo", 
+            colunas = ["Nome da pessoa", "Email", "Data de empréstimo",
                       "Data devolução prevista", "Título", "Nome da biblioteca"]
-            
+            desejadas = frozenset(colunas)
+
+            # Carregar dados: usecols faz a interseção com o cabeçalho já
+            # no parser, sem materializar as colunas descartadas. Engine
+            # calamine quando disponível, com fallback para a padrão.
+            try:
+                df = pd.read_excel(
+                    arquivo, usecols=lambda coluna: coluna in desejadas,
+                    engine="calamine"
+                )
+            except (ImportError, ValueError):
+                df = pd.read_excel(arquivo, usecols=lambda coluna: coluna in desejadas)
+
             # Verificar colunas
             colunas_existentes = [col for col in colunas if col in df.columns]
             if len(colunas_existentes) < 4:  # Mínimo de colunas necessárias
                 logger.error("Colunas insuficientes para processamento")
                 return False
-            
-            # Selecionar colunas
+
+            # Selecionar colunas (garante a ordem esperada)
             df = df[colunas_existentes]
-            
-            # Limpar dados (incluindo NaN, None, strings vazias)
-            df = df[
-                (df["Email"].notna()) & 
-                (df["Email"].astype(str).str.strip() != "") &
-                (df["Email"].astype(str).str.strip() != "nan")
-            ]
-            
-            # Formatar dados
-            df = df.sort_values(by="Nome da pessoa")
-            # Converter para minúsculo primeiro, depois aplicar title() para pegar apenas primeira letra maiúscula
-            df["Nome da pessoa"] = df["Nome da pessoa"].str.lower().str.title()
-            df["Nome da pessoa"] = df["Nome da pessoa"].str.split().str[0]
-            df["Email"] = df["Email"].str.replace(",", "; ", regex=False)
+
+            # Poucas bibliotecas distintas: categórico deixa o groupby da
+            # separação comparar códigos inteiros em vez de strings
+            if "Nome da biblioteca" in df.columns:
+                df["Nome da biblioteca"] = df["Nome da biblioteca"].astype("category")
+
+            # Strings com backend Arrow para as colunas de texto pesadas
+            try:
+                for coluna in ("Nome da pessoa", "Email"):
+                    if coluna in df.columns:
+                        df[coluna] = df[coluna].astype("string[pyarrow]")
+            except (ImportError, TypeError):
+                pass
+            
+            # Limpar dados (incluindo NaN, None, strings vazias): máscara
+            # única com o strip calculado uma só vez
+            email = df["Email"]
+            if email.dtype == object:
+                # Só o caminho object precisa da conversão; em
+                # string[pyarrow] o strip já roda no kernel Arrow
+                email = email.astype("string")
+            email = email.str.strip()
+            mask = email.notna() & (email != "") & (email.str.lower() != "nan")
+            df = df.loc[mask]
+            
+            # Formatar dados (a ordenação acontece uma única vez depois
+            # da formatação, logo antes da separação)
+            # Primeiro token numa única varredura de regex + title() (que
+            # já rebaixa o resto do token, como o lower().title() fazia)
+            df["Nome da pessoa"] = (
+                df["Nome da pessoa"].str.extract(r"^\s*(\S+)", expand=False).str.title()
+            )
+            # Pré-checagem barata em C: sem vírgulas (caso comum), a
+            # coluna não é realocada; com vírgulas, o replace roda só nas
+            # linhas marcadas (em string[pyarrow] ele despacha para o
+            # kernel C++ do Arrow)
+            com_virgula = df["Email"].str.contains(",", regex=False, na=False)
+            if com_virgula.any():
+                df.loc[com_virgula, "Email"] = (
+                    df.loc[com_virgula, "Email"].str.replace(",", "; ", regex=False)
+                )
             
             # Reordenar colunas se possível
             nova_ordem = ["Nome da pessoa", "Email", "Título", "Data de empréstimo", 
@@ -166,18 +361,27 @@ class ProcessadorSimples:
             if colunas_disponiveis:
                 df = df[colunas_disponiveis]
             
-            # Separar por biblioteca
+            # Ordenar uma única vez, já sobre os primeiros nomes curtos;
+            # todas as planilhas da separação herdam a ordenação
+            df = df.sort_values(by="Nome da pessoa", kind="mergesort", ignore_index=True)
+
+            # Separar por biblioteca: uma passagem de groupby no lugar de
+            # uma varredura booleana por biblioteca
             planilhas = {"Base": df}  # Adicionar planilha base
+            grupos = dict(tuple(df.groupby("Nome da biblioteca", observed=True, sort=False)))
+            vazio = df.iloc[0:0]
             for nome_planilha, nome_biblioteca in self.bibliotecas.items():
-                planilhas[nome_planilha] = df[df["Nome da biblioteca"] == nome_biblioteca]
+                planilhas[nome_planilha] = grupos.get(nome_biblioteca, vazio)
             
-            # Salvar resultados
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            arquivo_saida = self.pasta_saida / f"pendencias_{timestamp}.xlsx"
+            # Salvar resultados (mesmo timestamp do lote, quando houver;
+            # o stem da entrada mantém uma saída por arquivo do lote)
+            if timestamp is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            arquivo_saida = self.pasta_saida / f"pendencias_{timestamp}_{arquivo.stem}.xlsx"
             
-            with pd.ExcelWriter(arquivo_saida, engine="openpyxl") as writer:
-                for nome_planilha, df_planilha in planilhas.items():
-                    df_planilha.to_excel(writer, sheet_name=nome_planilha, index=False)
+            # Conversão paralela por planilha acima do limiar, escrita
+            # serial em streaming abaixo dele
+            _salvar_planilhas(arquivo_saida, planilhas)
             
             logger.info(f"Pendências processadas: {arquivo_saida}")
             return True
@@ -200,7 +404,7 @@ class ProcessadorSimples:
         except Exception as e:
             logger.error(f"Erro ao mover arquivo {arquivo}: {e}")
     
-    def processar_arquivo(self, arquivo: Path) -> bool:
+    def processar_arquivo(self, arquivo: Path, timestamp: str = None) -> bool:
         """Processa um arquivo específico."""
         try:
             # Verificar se é arquivo Excel
@@ -217,9 +421,9 @@ class ProcessadorSimples:
             
             # Processar baseado no tipo
             if tipo == "emprestimos":
-                sucesso = self._processar_emprestimos(arquivo)
+                sucesso = self._processar_emprestimos(arquivo, timestamp)
             else:  # pendencias
-                sucesso = self._processar_pendencias(arquivo)
+                sucesso = self._processar_pendencias(arquivo, timestamp)
             
             # Mover arquivo
             self._mover_arquivo(arquivo, sucesso)
@@ -235,13 +439,12 @@ class ProcessadorSimples:
         """Processa todos os arquivos na pasta de entrada."""
         logger.info("Verificando pasta de entrada...")
         
-        # Encontrar arquivos Excel
-        arquivos_excel = list(self.pasta_entrada.glob("*.xlsx")) + list(self.pasta_entrada.glob("*.xls"))
-        
-        # Filtrar arquivos que não estão nas subpastas
+        # Encontrar arquivos Excel: uma única varredura do diretório
+        # (iterdir já ignora subpastas, dispensando o filtro por parent
+        # e o segundo glob)
         arquivos_para_processar = [
-            arquivo for arquivo in arquivos_excel 
-            if arquivo.parent == self.pasta_entrada
+            arquivo for arquivo in self.pasta_entrada.iterdir()
+            if arquivo.is_file() and arquivo.suffix.lower() in (".xlsx", ".xls")
         ]
         
         if not arquivos_para_processar:
@@ -249,12 +452,27 @@ class ProcessadorSimples:
             return
         
         logger.info(f"Encontrados {len(arquivos_para_processar)} arquivos para processar.")
-        
-        for arquivo in arquivos_para_processar:
-            logger.info(f"Processando: {arquivo.name}")
-            
-            sucesso = self.processar_arquivo(arquivo)
-            
+
+        # Timestamp único por lote: um strftime só, e todas as saídas do
+        # lote compartilham o mesmo carimbo
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if len(arquivos_para_processar) == 1:
+            resultados = [self.processar_arquivo(arquivos_para_processar[0], timestamp)]
+        else:
+            # Cada arquivo é um pipeline independente (leitura, transformação,
+            # escrita e movimentação próprias) e limitado por CPU no parse do
+            # Excel: um processo por arquivo escala com os núcleos
+            with ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, len(arquivos_para_processar)),
+                initializer=_marcar_worker_do_lote,
+            ) as executor:
+                resultados = list(executor.map(
+                    partial(self.processar_arquivo, timestamp=timestamp),
+                    arquivos_para_processar,
+                ))
+
+        for arquivo, sucesso in zip(arquivos_para_processar, resultados):
             if sucesso:
                 logger.info(f"✅ {arquivo.name} processado com sucesso!")
             else:
@@ -13,18 +13,24 @@ Data: 2025
 
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
 # Importar módulos locais
 from processador_base import ProcessadorBase
 from config import (
-    ARQUIVOS_CONFIG, 
-    COLUNAS_EMPRESTIMOS, 
+    ARQUIVOS_CONFIG,
+    EMPRESTIMOS_IN,
+    EMPRESTIMOS_OUT,
+    PENDENCIAS_IN,
+    PENDENCIAS_OUT,
+    COLUNAS_EMPRESTIMOS,
+    COLUNAS_EMPRESTIMOS_IDX,
     COLUNAS_PENDENCIAS,
     ORDEM_COLUNAS_PENDENCIAS,
-    MAPEAMENTO_GENERO,
-    BIBLIOTECAS
+    BIBLIOTECAS,
+    apply_genero
 )
 
 class ProcessadorEmprestimos(ProcessadorBase):
@@ -32,8 +38,8 @@ class ProcessadorEmprestimos(ProcessadorBase):
     
     def __init__(self):
         """Inicializa o processador de empréstimos."""
-        config = ARQUIVOS_CONFIG["emprestimos"]
-        super().__init__(config["entrada"], config["saida"])
+        super().__init__(EMPRESTIMOS_IN, EMPRESTIMOS_OUT)
+        self.colunas_esperadas = list(COLUNAS_EMPRESTIMOS)
     
     def processar_dados_especificos(self) -> None:
         """Processa dados específicos de empréstimos."""
@@ -41,9 +47,9 @@ class ProcessadorEmprestimos(ProcessadorBase):
         if not self.validar_colunas(COLUNAS_EMPRESTIMOS):
             raise ValueError("Colunas necessárias não encontradas")
         
-        # Selecionar colunas
+        # Selecionar colunas (Index pré-construído evita recriá-lo por chamada)
         self.logger.info("Selecionando colunas relevantes")
-        self.df = self.df[COLUNAS_EMPRESTIMOS]
+        self.df = self.df.reindex(columns=COLUNAS_EMPRESTIMOS_IDX, copy=False)
         
         # Limpar dados
         self._limpar_dados_emprestimos()
@@ -64,24 +70,22 @@ class ProcessadorEmprestimos(ProcessadorBase):
     
     def _limpar_dados_emprestimos(self) -> None:
         """Limpa dados específicos de empréstimos."""
-        registros_iniciais = len(self.df)
-        
-        # Remover emails em branco (incluindo NaN, None, strings vazias)
-        self.df = self.df[
-            (self.df["Email"].notna()) & 
-            (self.df["Email"].astype(str).str.strip() != "") &
-            (self.df["Email"].astype(str).str.strip() != "nan")
-        ]
-        self.logger.info(f"Removidos {registros_iniciais - len(self.df)} registros sem email")
-        
-        # Remover Bibinternet
-        self.df = self.df[self.df["Nome pessoa empréstimo"] != "Bibinternet"]
-        
-        # Remover coluna desnecessária
-        self.df = self.df.drop(columns=["Nome pessoa empréstimo"])
-        
-        # Remover duplicatas
-        self.remover_duplicatas()
+        # Pipeline fundido: os filtros de email em branco (NaN, None,
+        # strings vazias) e de Bibinternet viram uma máscara única, e o
+        # .loc + drop encadeados materializam um só DataFrame, sem
+        # intermediários vivos entre os passos
+        email = self.df["Email"].astype("string").str.strip()
+        mask = (
+            email.notna() & (email != "") & (email.str.lower() != "nan")
+            & (self.df["Nome pessoa empréstimo"] != "Bibinternet")
+        )
+        filtrados = int((~mask).sum())
+        self.df = self.df.loc[mask].drop(columns=["Nome pessoa empréstimo"])
+        self.logger.info(f"Removidos {filtrados} registros sem email ou Bibinternet")
+
+        # Dedup pela chave natural do registro (Gênero é derivado da
+        # pessoa e não diferencia linhas): hash só sobre as colunas-chave
+        self.remover_duplicatas(subset=["Email", "Nome da biblioteca", "Nome da pessoa"])
     
     def _formatar_dados_emprestimos(self) -> None:
         """Formata dados específicos de empréstimos."""
@@ -91,8 +95,8 @@ class ProcessadorEmprestimos(ProcessadorBase):
         # Formatar nomes
         self.formatar_nomes()
         
-        # Substituir valores de gênero
-        self.df["Gênero"] = self.df["Gênero"].replace(MAPEAMENTO_GENERO)
+        # Substituir valores de gênero (renomeia só as categorias únicas)
+        apply_genero(self.df)
         
         # Formatar emails
         self.formatar_emails()
@@ -105,8 +109,8 @@ class ProcessadorPendencias(ProcessadorBase):
     
     def __init__(self):
         """Inicializa o processador de pendências."""
-        config = ARQUIVOS_CONFIG["pendencias"]
-        super().__init__(config["entrada"], config["saida"])
+        super().__init__(PENDENCIAS_IN, PENDENCIAS_OUT)
+        self.colunas_esperadas = list(COLUNAS_PENDENCIAS)
     
     def processar_dados_especificos(self) -> None:
         """Processa dados específicos de pendências."""
@@ -151,21 +155,17 @@ class ProcessadorPendencias(ProcessadorBase):
     def _limpar_dados_pendencias(self) -> None:
         """Limpa dados específicos de pendências."""
         registros_iniciais = len(self.df)
-        
-        # Filtrar registros sem email (incluindo NaN, None, strings vazias)
-        registros_sem_email = self.df[
-            (self.df["Email"].isna()) | 
-            (self.df["Email"].astype(str).str.strip() == "") |
-            (self.df["Email"].astype(str).str.strip() == "nan")
-        ]
-        self.logger.info(f"Encontrados {len(registros_sem_email)} registros sem email")
-        
+
+        # Filtrar registros sem email (incluindo NaN, None, strings
+        # vazias): uma única máscara com o strip calculado uma só vez; o
+        # diagnóstico sai do sum() da máscara, sem materializar o
+        # DataFrame complementar só para medir o tamanho
+        email = self.df["Email"].astype("string").str.strip()
+        sem_email = email.isna() | (email == "") | (email.str.lower() == "nan")
+        self.logger.info(f"Encontrados {int(sem_email.sum())} registros sem email")
+
         # Remover registros sem email
-        self.df = self.df[
-            (self.df["Email"].notna()) & 
-            (self.df["Email"].astype(str).str.strip() != "") &
-            (self.df["Email"].astype(str).str.strip() != "nan")
-        ]
+        self.df = self.df.loc[~sem_email]
         self.logger.info(f"Removidos {registros_iniciais - len(self.df)} registros sem email")
     
     def _formatar_dados_pendencias(self) -> None:
@@ -203,13 +203,21 @@ class ProcessadorUnificado:
             "pendencias": ProcessadorPendencias()
         }
     
-    def processar_tipo(self, tipo: str) -> bool:
+    def processar_tipo(
+        self,
+        tipo: str,
+        arquivo_entrada: Optional[str] = None,
+        arquivo_saida: Optional[str] = None,
+    ) -> bool:
         """
         Processa um tipo específico de relatório.
-        
+
         Args:
             tipo: Tipo de relatório ("emprestimos" ou "pendencias")
-            
+            arquivo_entrada: Caminho de entrada alternativo (padrão:
+                o configurado em ARQUIVOS_CONFIG)
+            arquivo_saida: Caminho de saída alternativo (padrão: idem)
+
         Returns:
             bool: True se processamento bem-sucedido, False caso contrário
         """
@@ -217,11 +225,20 @@ class ProcessadorUnificado:
             print(f"Tipo de relatório inválido: {tipo}")
             print("Tipos válidos: emprestimos, pendencias")
             return False
-        
+
         try:
             print(f"Processando relatório de {tipo}...")
-            return self.processadores[tipo].processar()
-            
+            processador = self.processadores[tipo]
+
+            # Caminhos por parâmetro: evita mutar ARQUIVOS_CONFIG (que é
+            # compartilhado e viraria uma corrida sob paralelismo)
+            if arquivo_entrada is not None:
+                processador.arquivo_entrada = arquivo_entrada
+            if arquivo_saida is not None:
+                processador.arquivo_saida = arquivo_saida
+
+            return processador.processar()
+
         except Exception as e:
             print(f"Erro ao processar {tipo}: {e}")
             return False
@@ -250,6 +267,38 @@ class ProcessadorUnificado:
         return resultados
 
 
+def _processar_um(tipo: str) -> bool:
+    """
+    Processa um único tipo de relatório (função de módulo para ser
+    picklável pelos processos workers).
+
+    Args:
+        tipo: Tipo de relatório ("emprestimos" ou "pendencias")
+
+    Returns:
+        bool: True se processamento bem-sucedido, False caso contrário
+    """
+    return ProcessadorUnificado().processar_tipo(tipo)
+
+
+def processar_tudo() -> Dict[str, bool]:
+    """
+    Processa todos os tipos de relatório em paralelo.
+
+    Cada tipo é um pipeline Excel -> Excel independente e limitado por
+    CPU, então um processo por tipo contorna o GIL.
+
+    Returns:
+        Dict com resultados de cada processamento
+    """
+    tipos = list(ARQUIVOS_CONFIG.keys())
+
+    with ProcessPoolExecutor(max_workers=len(tipos)) as executor:
+        resultados = list(executor.map(_processar_um, tipos))
+
+    return dict(zip(tipos, resultados))
+
+
 def main():
     """Função principal do script."""
     if len(sys.argv) < 2:
@@ -258,6 +307,7 @@ def main():
         print("  emprestimos - Processa relatório de empréstimos")
         print("  pendencias  - Processa relatório de pendências")
         print("  todos       - Processa ambos os relatórios")
+        print("  paralelo    - Processa ambos em processos paralelos")
         return 1
     
     tipo = sys.argv[1].lower()
@@ -265,9 +315,12 @@ def main():
     try:
         processador = ProcessadorUnificado()
         
-        if tipo == "todos":
-            resultados = processador.processar_todos()
-            
+        if tipo in ("todos", "paralelo"):
+            if tipo == "paralelo":
+                resultados = processar_tudo()
+            else:
+                resultados = processador.processar_todos()
+
             print(f"\n{'='*50}")
             print("RESUMO DOS RESULTADOS")
             print(f"{'='*50}")
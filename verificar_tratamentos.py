@@ -1,18 +1,71 @@
 #!/usr/bin/env python3
 import pandas as pd
+import numpy as np
 import os
 import glob
 
+# polars (opcional): leitura via calamine + varreduras multi-thread em
+# SIMD, bem mais rápido para inspecionar exportações grandes
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+def _verificar_com_polars(arquivo_path):
+    """Inspeciona todas as planilhas do arquivo com polars."""
+    planilhas = pl.read_excel(arquivo_path, sheet_id=0)
+
+    print(f"Planilhas encontradas: {list(planilhas.keys())}")
+
+    for sheet_name, df in planilhas.items():
+        print(f"\n--- Planilha: {sheet_name} ---")
+        print(f"Colunas: {df.columns}")
+        print(f"Total de registros: {len(df)}")
+
+        if "Nome da pessoa" in df.columns:
+            print("Primeiros 5 nomes:")
+            for i, nome in enumerate(df["Nome da pessoa"].head(5).to_list()):
+                print(f"  {i+1}. '{nome}' (tipo: {type(nome)})")
+
+            # Verificar se há nomes com espaços (nomes completos)
+            nomes_completos = df.filter(
+                pl.col("Nome da pessoa").str.contains(" ", literal=True)
+            )
+            if len(nomes_completos) > 0:
+                print(f"\n⚠️  ENCONTRADOS {len(nomes_completos)} registros com nomes completos:")
+                for i, nome in enumerate(nomes_completos["Nome da pessoa"].head(3).to_list()):
+                    print(f"  {i+1}. '{nome}'")
+            else:
+                print("✅ Todos os nomes estão apenas com o primeiro nome")
+
+        if "Email" in df.columns:
+            emails_vazios = df.filter(
+                pl.col("Email").is_null()
+                | (pl.col("Email").cast(pl.Utf8).str.strip_chars() == "")
+            )
+            print(f"Registros sem email: {len(emails_vazios)}")
+
+
 def verificar_arquivo(arquivo_path, nome_arquivo):
     print(f"\n=== VERIFICANDO {nome_arquivo} ===")
-    
+
     if not os.path.exists(arquivo_path):
         print(f"Arquivo não encontrado: {arquivo_path}")
         return
-    
+
     try:
-        # Ler todas as planilhas do arquivo
-        df_dict = pd.read_excel(arquivo_path, sheet_name=None)
+        if pl is not None:
+            _verificar_com_polars(arquivo_path)
+            return
+
+        # Ler todas as planilhas do arquivo (engine calamine quando
+        # disponível: parser Rust em streaming, bem mais rápido que o
+        # openpyxl para a verificação multi-planilha)
+        try:
+            df_dict = pd.read_excel(arquivo_path, sheet_name=None, engine="calamine")
+        except (ImportError, ValueError):
+            df_dict = pd.read_excel(arquivo_path, sheet_name=None)
         
         print(f"Planilhas encontradas: {list(df_dict.keys())}")
         
@@ -22,22 +75,30 @@ def verificar_arquivo(arquivo_path, nome_arquivo):
             print(f"Total de registros: {len(df)}")
             
             if "Nome da pessoa" in df.columns:
+                # Uma passagem em numpy: o array é materializado uma vez e
+                # o find roda em C sobre ele inteiro, em vez de head +
+                # str.contains + head varrendo a coluna três vezes
+                nomes = df["Nome da pessoa"].to_numpy()
                 print("Primeiros 5 nomes:")
-                for i, nome in enumerate(df["Nome da pessoa"].head(5)):
+                for i, nome in enumerate(nomes[:5]):
                     print(f"  {i+1}. '{nome}' (tipo: {type(nome)})")
-                
+
                 # Verificar se há nomes com espaços (nomes completos)
-                nomes_completos = df[df["Nome da pessoa"].str.contains(" ", na=False)]
-                if len(nomes_completos) > 0:
-                    print(f"\n⚠️  ENCONTRADOS {len(nomes_completos)} registros com nomes completos:")
-                    for i, nome in enumerate(nomes_completos["Nome da pessoa"].head(3)):
+                com_espaco = np.char.find(nomes.astype(str), " ") >= 0
+                total_completos = int(com_espaco.sum())
+                if total_completos > 0:
+                    print(f"\n⚠️  ENCONTRADOS {total_completos} registros com nomes completos:")
+                    for i, nome in enumerate(nomes[com_espaco][:3]):
                         print(f"  {i+1}. '{nome}'")
                 else:
                     print("✅ Todos os nomes estão apenas com o primeiro nome")
             
             if "Email" in df.columns:
-                emails_vazios = df[df["Email"].isna() | (df["Email"].astype(str).str.strip() == "")]
-                print(f"Registros sem email: {len(emails_vazios)}")
+                # Nulos e strings em branco contados numa única varredura,
+                # sem materializar o DataFrame filtrado só para medir
+                emails = df["Email"].to_numpy()
+                em_branco = pd.isna(emails) | (np.char.strip(emails.astype(str)) == "")
+                print(f"Registros sem email: {int(em_branco.sum())}")
     
     except Exception as e:
         print(f"Erro ao ler arquivo: {e}")